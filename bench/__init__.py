@@ -0,0 +1 @@
+# Benchmark dan generator data sintetis (tidak dipakai oleh dashboard)
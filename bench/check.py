@@ -0,0 +1,92 @@
+# Pemeriksaan konsistensi jalur cepat terhadap jalur acuan pada data sintetis berisi nilai kosong
+# (Kabupaten/Kota dan Tanggal kosong di sebagian baris). Proses keluar dengan kode 1 jika ada
+# pemeriksaan yang gagal.
+#
+# Pemakaian: python -m bench.check --rows 20000
+import argparse
+import io
+import sys
+
+import numpy as np
+import pandas as pd
+
+from bench import synthetic
+from qoe import cube, filters, ingest
+
+# Setiap baris ke-n dikosongkan pada kolom tersebut
+BLANK_EVERY = {'Kabupaten/Kota': 7, 'Tanggal': 11}
+
+
+def blank_frame(n_rows, seed=0):
+    # Frame bertipe (seperti hasil ingest CSV) dengan sebagian dimensi kosong
+    raw = synthetic.generate(n_rows, seed)
+    for col, step in BLANK_EVERY.items():
+        raw.loc[::step, col] = np.nan
+    buffer = io.StringIO()
+    raw.to_csv(buffer, index=False)
+    buffer.seek(0)
+    return ingest.parse_csv(buffer)
+
+
+def _sorted_cells(data_cube):
+    keys = [c for c in data_cube.columns if c not in cube.STAT_COLUMNS]
+    cells = data_cube.astype({k: object for k in keys})[keys + cube.STAT_COLUMNS]
+    return cells.sort_values(keys, na_position='last').reset_index(drop=True)
+
+
+def check_cube_chunks(df, chunk_rows=1000):
+    # Kubus bertahap (update_cube per chunk, seperti ingest streaming) harus sama dengan build_cube
+    full = cube.build_cube(df, ingest.OPERATOR_COLUMNS)
+    data_cube = None
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows].reset_index(drop=True)
+        data_cube = cube.update_cube(data_cube, chunk, ingest.OPERATOR_COLUMNS, start)
+    try:
+        pd.testing.assert_frame_equal(_sorted_cells(full), _sorted_cells(data_cube), check_dtype=False)
+    except AssertionError as e:
+        return [f"update_cube per {chunk_rows} baris berbeda dari build_cube: {e}"]
+    return []
+
+
+def check_filter_isin(df):
+    # FilterIndex.filter harus sama dengan isin pada data asli (baris berdimensi kosong dibuang),
+    # baik saat semua nilai dipilih maupun sebagian
+    index = filters.FilterIndex(df)
+    errors = []
+    for dim in ['Kabupaten/Kota', 'Alamat']:
+        values = index.unique(dim)
+        for label, selected in [('semua', values), ('sebagian', values[1:])]:
+            expected = np.flatnonzero(df[dim].isin(selected).to_numpy())
+            rows = index.filter(None, dim, selected)
+            rows = np.arange(len(df)) if rows is None else rows
+            if not np.array_equal(rows, expected):
+                errors.append(f"filter {dim} ({label}): {len(rows):,} baris, isin {len(expected):,} baris")
+    return errors
+
+
+CHECKS = [
+    ('cube_chunks', check_cube_chunks),
+    ('filter_isin', check_filter_isin),
+]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m bench.check',
+                                     description="Periksa konsistensi jalur cepat pada data dengan nilai kosong.")
+    parser.add_argument('--rows', type=int, default=20_000, help="Ukuran data (default: 20000)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    df = blank_frame(args.rows, args.seed)
+    failed = False
+    for name, check in CHECKS:
+        errors = check(df)
+        print(f"{name:<16}{'GAGAL' if errors else 'OK'}")
+        for error in errors:
+            print(f"  {error}")
+        failed |= bool(errors)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,259 @@
+# Benchmark pipeline dashboard per tahap (load, derivasi tanggal, filter, tabel panjang,
+# grafik, peta, peta grid, lintasan, perbandingan, Before/After, skor QoE) pada data sintetis.
+# Setiap tahap diukur waktu (minimum dari beberapa pengulangan) dan puncak alokasi memori
+# (tracemalloc), lalu dibandingkan dengan baseline tersimpan; proses keluar dengan kode 1 jika
+# ada tahap yang melewati toleransi.
+#
+# Pemakaian:
+#   python -m bench.run --rows 100000            # bandingkan dengan bench/baselines.json
+#   python -m bench.run --rows 100000 --update   # simpan hasil sebagai baseline baru
+# Baseline bergantung pada mesin; perbarui dengan --update saat berpindah mesin.
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+from bench import synthetic
+from qoe import beforeafter, cube, filters, ingest, longtable, panels, scoring
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines.json')
+DATA_DIR = os.path.join(ingest.CACHE_DIR, 'bench')
+
+# Selisih absolut yang selalu diizinkan agar tahap yang sangat cepat tidak gagal karena noise
+TIME_SLACK = 0.02
+MEM_SLACK_MB = 1.0
+
+
+def dataset_path(n_rows, seed):
+    # CSV sintetis disimpan di cache agar tidak dibuat ulang setiap run
+    path = os.path.join(DATA_DIR, f"synthetic-{n_rows}-s{seed}.csv")
+    if not os.path.exists(path):
+        os.makedirs(DATA_DIR, exist_ok=True)
+        synthetic.write_csv(path, n_rows, seed)
+    return path
+
+
+def stage_load(ctx):
+    return {'raw': pd.read_csv(ctx['path'], dtype=ingest.CSV_DTYPES)}
+
+
+def stage_dates(ctx):
+    # Salinan dangkal: kolom baru hanya mengganti kolom di salinan, data mentah tetap utuh
+    return {'df': ingest.type_frame(ctx['raw'].copy(deep=False))}
+
+
+def stage_filter(ctx):
+    # Kaskade filter seperti di dashboard: satu bulan, semua kabupaten, satu lokasi dikecualikan
+    df = ctx['df']
+    index = filters.FilterIndex(df)
+    rows = index.rows_for('Bulan', index.unique('Bulan')[:1])
+    rows = index.filter(rows, 'Kabupaten/Kota', index.unique('Kabupaten/Kota', rows))
+    rows = index.filter(rows, 'Alamat', index.unique('Alamat', rows)[1:])
+
+    result = {'index': index}
+    for jenis, key in [('Route Test', 'route'), ('Static Test', 'static')]:
+        rows_test = filters.intersect(rows, index.rows_for('Jenis Pengukuran', [jenis]))
+        parameter = index.unique('Parameter', rows_test)[0]
+        result[f'param_{key}'] = parameter
+        result[f'rows_{key}'] = filters.intersect(rows_test, index.rows_for('Parameter', [parameter]))
+    return result
+
+
+def stage_melt(ctx):
+    data_long, data_dims = longtable.build_long(ctx['df'], ingest.OPERATOR_COLUMNS)
+    view = longtable.long_view(data_long, data_dims, ctx['rows_route'], ['Alamat', 'Tanggal_str'])
+    return {'long': data_long, 'dims': data_dims, 'view': view}
+
+
+def stage_chart(ctx):
+    charts = []
+    for key, title in [('route', 'Route Test'), ('static', 'Static Test')]:
+        fig = panels.create_bar_figure(ctx['long'], ctx['dims'], ctx[f'rows_{key}'], ctx[f'param_{key}'], title)
+        charts.append(fig.to_json() if fig is not None else None)
+    return {'charts': charts}
+
+
+def _map_html(ctx, marker_mode, route_tracks=False):
+    combined_map = panels.create_combined_map(ctx['df'], ctx['long'], ctx['dims'], ctx['rows_route'], ctx['rows_static'],
+                                              ctx['param_route'], ctx['param_static'], marker_mode,
+                                              route_tracks=route_tracks)
+    if combined_map is None:
+        return None
+    combined_map.add_layer_control()
+    return combined_map.to_html()
+
+
+def stage_map(ctx):
+    return {'map': _map_html(ctx, panels.MARKER_MODE_FAST)}
+
+
+def stage_map_grid(ctx):
+    # Mode grid: piramida agregat per level zoom ditambahkan ke payload titik
+    return {'map_grid': _map_html(ctx, panels.MARKER_MODE_GRID)}
+
+
+def stage_map_tracks(ctx):
+    # Konfigurasi bawaan dashboard: grid untuk Static Test, lintasan untuk Route Test
+    return {'map_tracks': _map_html(ctx, panels.MARKER_MODE_GRID, route_tracks=True)}
+
+
+def stage_comparison(ctx):
+    data_cube = cube.build_cube(ctx['df'], ingest.OPERATOR_COLUMNS)
+    bulan = ctx['index'].unique('Bulan')[0]
+    tables = []
+    for key, jenis in [('route', 'Route Test'), ('static', 'Static Test')]:
+        summary = cube.query(data_cube, ingest.OPERATOR_COLUMNS, ctx[f'param_{key}'], jenis, bulan)
+        tables.append(cube.comparison_table(summary, ctx[f'param_{key}'], jenis))
+    return {'cube': data_cube, 'tables': tables}
+
+
+def stage_before_after(ctx):
+    # Penyejajaran Before/After seluruh data beserta peringkat membaik/memburuk
+    deltas = beforeafter.build_deltas(ctx['long'], ctx['dims'])
+    ranked = [beforeafter.top_k(deltas, 10, improved) for improved in (True, False)]
+    return {'deltas': deltas, 'ranked': ranked, 'delta_summary': beforeafter.parameter_summary(deltas)}
+
+
+def stage_scoring(ctx):
+    # Skor QoE gabungan seluruh data beserta peringkat tertinggi/terendah dan rata-rata per operator
+    scores = scoring.composite_scores(scoring.parameter_matrix(ctx['long'], ctx['dims']))
+    ranked = [scoring.top_k(scores, 10, best) for best in (True, False)]
+    return {'scores': scores, 'score_ranked': ranked, 'score_summary': scoring.operator_summary(scores)}
+
+
+STAGES = [
+    ('load', stage_load),
+    ('dates', stage_dates),
+    ('filter', stage_filter),
+    ('melt', stage_melt),
+    ('chart', stage_chart),
+    ('map', stage_map),
+    ('map_grid', stage_map_grid),
+    ('map_tracks', stage_map_tracks),
+    ('comparison', stage_comparison),
+    ('before_after', stage_before_after),
+    ('scoring', stage_scoring),
+]
+
+
+def measure(stage, ctx, repeat):
+    # Waktu: minimum dari beberapa run (run pertama juga memanaskan import/cache template).
+    # Memori: satu run tambahan di bawah tracemalloc, dipisah karena tracemalloc memperlambat.
+    seconds = []
+    for _ in range(max(repeat, 1)):
+        start = time.perf_counter()
+        result = stage(ctx)
+        seconds.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        stage(ctx)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, {'seconds': round(min(seconds), 4), 'peak_mb': round(peak / 2**20, 2)}
+
+
+def run(n_rows, seed=0, repeat=3, stages=None):
+    ctx = {'path': dataset_path(n_rows, seed)}
+    results = {}
+    for name, stage in STAGES:
+        if stages and name not in stages:
+            # Tahap yang tidak diukur tetap dijalankan karena tahap berikutnya membutuhkan hasilnya
+            ctx.update(stage(ctx))
+            continue
+        result, results[name] = measure(stage, ctx, repeat)
+        ctx.update(result)
+    return results
+
+
+def load_baselines(path=BASELINE_FILE):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_baselines(baselines, path=BASELINE_FILE):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+        f.write('\n')
+    os.replace(tmp_path, path)
+
+
+def regressions(results, baseline, time_tolerance, mem_tolerance):
+    # Daftar (tahap, metrik, nilai, baseline) yang melewati toleransi
+    found = []
+    for name, metrics in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if metrics['seconds'] > base['seconds'] * (1 + time_tolerance) + TIME_SLACK:
+            found.append((name, 'seconds', metrics['seconds'], base['seconds']))
+        if metrics['peak_mb'] > base['peak_mb'] * (1 + mem_tolerance) + MEM_SLACK_MB:
+            found.append((name, 'peak_mb', metrics['peak_mb'], base['peak_mb']))
+    return found
+
+
+def report(results, baseline):
+    print(f"{'tahap':<12}{'detik':>10}{'baseline':>10}{'MB puncak':>12}{'baseline':>10}")
+    for name, metrics in results.items():
+        base = baseline.get(name, {})
+        print(f"{name:<12}{metrics['seconds']:>10.4f}{base.get('seconds', float('nan')):>10.4f}"
+              f"{metrics['peak_mb']:>12.2f}{base.get('peak_mb', float('nan')):>10.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m bench.run',
+                                     description="Benchmark pipeline QoE per tahap terhadap baseline tersimpan.")
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000], help="Ukuran data (boleh lebih dari satu)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3, help="Jumlah pengulangan pengukuran waktu (default: 3)")
+    parser.add_argument('--stages', nargs='+', choices=[name for name, _ in STAGES], help="Hanya ukur tahap ini")
+    parser.add_argument('--time-tolerance', type=float, default=0.5,
+                        help="Kenaikan waktu relatif yang masih diterima (default: 0.5 = 50%%)")
+    parser.add_argument('--mem-tolerance', type=float, default=0.25,
+                        help="Kenaikan puncak memori relatif yang masih diterima (default: 0.25 = 25%%)")
+    parser.add_argument('--baseline', default=BASELINE_FILE, help="File baseline JSON")
+    parser.add_argument('--update', action='store_true', help="Simpan hasil sebagai baseline, tanpa pengecekan")
+    args = parser.parse_args(argv)
+
+    baselines = load_baselines(args.baseline)
+    failed = []
+    for n_rows in args.rows:
+        key = str(n_rows)
+        print(f"\n== {n_rows:,} baris ==")
+        results = run(n_rows, args.seed, args.repeat, args.stages)
+        report(results, baselines.get(key, {}))
+
+        if args.update:
+            baselines.setdefault(key, {}).update(results)
+            continue
+        if key not in baselines:
+            print(f"Belum ada baseline untuk {n_rows:,} baris (jalankan dengan --update).")
+            continue
+        for name, metric, value, base in regressions(results, baselines[key], args.time_tolerance, args.mem_tolerance):
+            failed.append((n_rows, name, metric, value, base))
+
+    if args.update:
+        save_baselines(baselines, args.baseline)
+        print(f"\nBaseline disimpan ke {args.baseline}")
+        return 0
+
+    if failed:
+        print("\nREGRESI:")
+        for n_rows, name, metric, value, base in failed:
+            print(f"  {n_rows:,} baris / {name}: {metric} {value} > baseline {base}")
+        return 1
+    print("\nTidak ada regresi.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,169 @@
+# Generator data QoE sintetis dengan skema yang sama seperti
+# "data/Data QoS Posko 1446 H Before After.csv". Setiap pengukuran (lokasi, tanggal)
+# menghasilkan satu baris per parameter: 3 parameter untuk Route Test dan 7 untuk Static Test.
+# Data dibuat per chunk sehingga file 10 juta baris dapat ditulis dengan memori terbatas.
+#
+# Pemakaian: python -m bench.synthetic data_10m.csv --rows 10000000 --seed 0
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = ['Bulan', 'Hari', 'Tanggal', 'Jenis Pengukuran', 'Test', 'Parameter',
+           'Telkomsel', 'IOH', 'XL Axiata', 'Longitude', 'Latitude',
+           'Kabupaten/Kota', 'Alamat', 'Keterangan']
+
+OPERATORS = ['Telkomsel', 'IOH', 'XL Axiata']
+
+BULAN = ['Januari', 'Februari', 'Maret', 'April', 'Mei', 'Juni', 'Juli',
+         'Agustus', 'September', 'Oktober', 'November', 'Desember']
+HARI = ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat', 'Sabtu', 'Minggu']
+
+# Kabupaten/Kota dan titik pusat koordinatnya (lat, lon)
+KABUPATEN = {
+    'Kendari': (-3.99, 122.51),
+    'Konawe Selatan': (-4.30, 122.46),
+    'Konawe': (-3.93, 122.10),
+    'Kolaka': (-4.05, 121.60),
+    'Muna': (-4.90, 122.60),
+    'Buton': (-5.30, 122.90),
+    'Bau-Bau': (-5.47, 122.62),
+    'Bombana': (-4.65, 121.90),
+}
+
+# Parameter per jenis pengukuran: (nama, test, rata-rata nilai per operator)
+PARAMETERS = {
+    'Route Test': [
+        ('Durations', 'Route Test', (14.0, 17.0, 18.0)),
+        ('Distance (km)', 'Route Test', (12.7, 10.0, 8.3)),
+        ('DL speed (Mbps)', 'Route Test', (12.0, 14.0, 7.9)),
+    ],
+    'Static Test': [
+        ('DL (Mbps)', 'Speed Test', (20.1, 25.0, 4.0)),
+        ('UL (Mbps)', 'Speed Test', (10.8, 9.0, 4.3)),
+        ('Ping (ms)', 'Speed Test', (209.1, 240.0, 279.0)),
+        ('Loading time (ms)', 'Web Test', (243.4, 300.0, 411.2)),
+        ('Throughput W (Mbps)', 'Web Test', (6.7, 5.0, 0.3)),
+        ('Initial Buffering (ms)', 'Video Test', (220.8, 180.0, 0.1)),
+        ('Throughput V (Mbps)', 'Video Test', (8.0, 6.0, 1.9)),
+    ],
+}
+
+KETERANGAN = ['Posko Before Idul Fitri', 'Posko After Idul Fitri']
+
+# Porsi nilai 0 per operator (mengikuti sampel asli)
+ZERO_SHARE = (0.08, 0.12, 0.22)
+
+DEFAULT_CHUNK_ROWS = 500_000
+
+
+def _locations(n_locations, rng):
+    # Tabel lokasi: kabupaten, alamat, koordinat dan jenis pengukurannya
+    kab_names = list(KABUPATEN)
+    kab = rng.integers(0, len(kab_names), n_locations)
+    centers = np.array([KABUPATEN[name] for name in kab_names])
+    route = rng.random(n_locations) < 0.4
+    prefix = np.where(route, 'RT Lokasi ', 'Lokasi ')
+    return {
+        'kab': np.asarray(kab_names, dtype=object)[kab],
+        'alamat': np.char.add(prefix.astype(str), np.char.zfill(np.arange(n_locations).astype(str), 6)).astype(object),
+        'lat': np.round(centers[kab, 0] + rng.normal(0, 0.1, n_locations), 6),
+        'lon': np.round(centers[kab, 1] + rng.normal(0, 0.1, n_locations), 6),
+        'jenis': np.where(route, 'Route Test', 'Static Test').astype(object),
+    }
+
+
+def _chunk(n_rows, locations, dates, rng):
+    # Bangun n_rows baris: pilih pengukuran (lokasi, tanggal), lalu pecah per parameter
+    n_locations = len(locations['kab'])
+    n_measure = n_rows // 3 + 1
+    loc = rng.integers(0, n_locations, n_measure)
+    route = locations['jenis'][loc] == 'Route Test'
+    n_params = np.where(route, len(PARAMETERS['Route Test']), len(PARAMETERS['Static Test']))
+    ends = np.cumsum(n_params)
+    n_measure = int(np.searchsorted(ends, n_rows)) + 1
+    loc, route, n_params = loc[:n_measure], route[:n_measure], n_params[:n_measure]
+
+    measure = np.repeat(np.arange(n_measure), n_params)[:n_rows]
+    starts = np.repeat(np.cumsum(n_params) - n_params, n_params)[:n_rows]
+    param_pos = np.arange(len(measure)) - starts
+    row_route = route[measure]
+    # Indeks parameter gabungan: Route Test 0..2, Static Test 3..9
+    param_idx = np.where(row_route, param_pos, len(PARAMETERS['Route Test']) + param_pos)
+
+    all_params = PARAMETERS['Route Test'] + PARAMETERS['Static Test']
+    names = np.array([p[0] for p in all_params], dtype=object)
+    tests = np.array([p[1] for p in all_params], dtype=object)
+    means = np.array([p[2] for p in all_params])
+
+    date_idx = rng.integers(0, len(dates), n_measure)[measure]
+    tanggal = dates[date_idx]
+    row_loc = loc[measure]
+
+    frame = {
+        'Bulan': np.asarray(BULAN, dtype=object)[tanggal.month.to_numpy() - 1],
+        'Hari': np.asarray(HARI, dtype=object)[tanggal.dayofweek.to_numpy()],
+        'Tanggal': np.asarray([f"{d.month}/{d.day}/{d.year}" for d in dates], dtype=object)[date_idx],
+        'Jenis Pengukuran': np.where(row_route, 'Route Test', 'Static Test').astype(object),
+        'Test': tests[param_idx],
+        'Parameter': names[param_idx],
+    }
+    for i, op in enumerate(OPERATORS):
+        nilai = rng.gamma(2.0, means[param_idx, i] / 2.0)
+        nilai[rng.random(len(nilai)) < ZERO_SHARE[i]] = 0.0
+        frame[op] = np.round(nilai, 2)
+    frame['Longitude'] = locations['lon'][row_loc]
+    frame['Latitude'] = locations['lat'][row_loc]
+    frame['Kabupaten/Kota'] = locations['kab'][row_loc]
+    frame['Alamat'] = locations['alamat'][row_loc]
+    frame['Keterangan'] = np.asarray(KETERANGAN, dtype=object)[(date_idx * 2 >= len(dates)).astype(int)]
+    return pd.DataFrame(frame, columns=COLUMNS)
+
+
+def iter_chunks(n_rows, seed=0, n_locations=None, start='2025-01-01', days=365, chunk_rows=DEFAULT_CHUNK_ROWS):
+    # Hasilkan DataFrame per chunk; hasil deterministik untuk seed dan ukuran chunk yang sama
+    seeds = np.random.SeedSequence(seed)
+    loc_seed, data_seed = seeds.spawn(2)
+    if n_locations is None:
+        n_locations = int(min(max(40, n_rows // 200), 50_000))
+    locations = _locations(n_locations, np.random.default_rng(loc_seed))
+    dates = pd.date_range(start, periods=days, freq='D')
+
+    n_chunks = max(1, -(-n_rows // chunk_rows))
+    for i, chunk_seed in enumerate(data_seed.spawn(n_chunks)):
+        size = min(chunk_rows, n_rows - i * chunk_rows)
+        if size > 0:
+            yield _chunk(size, locations, dates, np.random.default_rng(chunk_seed))
+
+
+def generate(n_rows, seed=0, **kwargs):
+    chunks = list(iter_chunks(n_rows, seed, **kwargs))
+    return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=COLUMNS)
+
+
+def write_csv(path, n_rows, seed=0, **kwargs):
+    # Tulis CSV per chunk lewat file sementara
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+        for i, chunk in enumerate(iter_chunks(n_rows, seed, **kwargs)):
+            chunk.to_csv(f, index=False, header=(i == 0))
+    os.replace(tmp_path, path)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m bench.synthetic',
+                                     description="Buat file CSV QoE sintetis dengan skema data asli.")
+    parser.add_argument('path', help="File CSV output")
+    parser.add_argument('--rows', type=int, default=100_000, help="Jumlah baris (default: 100000)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--locations', type=int, default=None, help="Jumlah lokasi (default: sebanding jumlah baris)")
+    parser.add_argument('--days', type=int, default=365, help="Rentang hari mulai 2025-01-01 (default: 365)")
+    args = parser.parse_args(argv)
+    write_csv(args.path, args.rows, args.seed, n_locations=args.locations, days=args.days)
+    print(f"{args.rows:,} baris ditulis ke {args.path}")
+
+
+if __name__ == '__main__':
+    main()
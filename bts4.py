@@ -1,16 +1,187 @@
-import pandas as pd
+import functools
+import logging
+import math
+import os
+import pickle
 import streamlit as st
-import plotly.express as px
-import leafmap.foliumap as leafmap
-import folium
-from folium.plugins import MarkerCluster
+import plotly.io as pio
+import streamlit.components.v1 as components
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+import threading
 import time
+# qoe.panels mengimpor plotly.express/folium/leafmap baru saat panel pertama dibuat,
+# sehingga file uploader tampil tanpa menunggu library peta dimuat
+from qoe import beforeafter, campaign, cube, datastore, filters, ingest, longtable, panels, precompute, profiling, rendercache, scoring, streaming, viewer, warmup
 
-# Fungsi untuk memuat data
+# Store dataset bersama: satu frame bertipe per hash isi file untuk semua sesi (tanpa salinan
+# per sesi), dengan anggaran byte LRU dan referensi per sesi (lihat qoe.datastore)
+@st.cache_resource
+def get_dataset_store():
+    return datastore.DatasetStore()
+
+def get_session_id():
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else None
+
+# Lepas referensi sesi yang sudah ditutup agar dataset-nya bisa dikeluarkan dari store
+def prune_dataset_store():
+    if st.runtime.exists():
+        runtime = st.runtime.get_instance()
+        get_dataset_store().prune(runtime.is_active_session)
+
+# Fungsi untuk memuat data (dikunci dengan hash isi file; parsing bertipe + snapshot Parquet ada di qoe.ingest)
+def load_data(file_hash, _file):
+    return get_dataset_store().get_or_load(file_hash, lambda: ingest.load_snapshot(_file.getvalue(), file_hash),
+                                           get_session_id())
+
+# Partisi bertipe hasil ingest bertahap (qoe.streaming)
+def load_dataset(file_hash):
+    return get_dataset_store().get_or_load(file_hash, lambda: streaming.read_dataset(file_hash), get_session_id())
+
+# Kubus agregat (min/max/mean/count + lokasi ekstrem) dibangun sekali per file
+def load_cube(file_hash, _df):
+    def build():
+        # Pada ingest bertahap kubus sudah dibangun secara inkremental per chunk
+        data_cube = streaming.read_cube(file_hash)
+        if data_cube is None:
+            data_cube = cube.build_cube(_df, ingest.OPERATOR_COLUMNS)
+        return data_cube
+    return get_dataset_store().derived(file_hash, 'cube', build)
+
+# Tabel panjang kanonik (row, Operator, Nilai) + tabel dimensi, dibangun sekali per file
+def load_long(file_hash, _df):
+    return get_dataset_store().derived(file_hash, 'long', lambda: longtable.build_long(_df, ingest.OPERATOR_COLUMNS))
+
+# Indeks filter (posting list per dimensi) bersifat read-only sehingga dibagi tanpa salinan
+def load_filter_index(file_hash, _df):
+    return get_dataset_store().derived(file_hash, 'filter_index', lambda: filters.FilterIndex(_df))
+
+# Cache render (JSON figur dan HTML peta) dipakai bersama oleh semua sesi dalam proses
+@st.cache_resource
+def get_render_cache():
+    return rendercache.RenderCache()
+
+# Thread pool prakomputasi dan statistik pemilihan parameter, dibagi oleh semua sesi
+@st.cache_resource
+def get_precompute_executor():
+    return precompute.make_executor()
+
+@st.cache_resource
+def get_parameter_usage():
+    return precompute.UsageCounter()
+
+# Dataset QOE_PRELOAD dimuat dan diindeks sekali per proses server di thread latar, ditambah
+# impor library grafik/peta. Thread ini baru dimulai oleh run script sesi pertama, sehingga
+# ingest CSV tetap ditanggung pengguna pertama; jalankan "python -m qoe.warmup <file.csv>"
+# sebelum server agar saat itu tinggal membaca partisi hasil ingest (lihat README).
+@st.cache_resource
+def start_preload(path):
+    def run():
+        try:
+            file_hash = warmup.warm(path)
+            df = load_dataset(file_hash)
+            load_filter_index(file_hash, df)
+            load_cube(file_hash, df)
+            load_long(file_hash, df)
+            panels.preload_libraries()
+        except Exception as e:
+            logging.getLogger(__name__).exception("Preload '%s' gagal", path)
+            thread.error = e
+    
+    thread = threading.Thread(target=run, name="qoe-preload", daemon=True)
+    thread.error = None
+    thread.start()
+    return thread
+
+# Store kampanye SQLite (satu koneksi per proses, akses diserialkan di qoe.campaign)
+@st.cache_resource
+def get_campaign_store():
+    return campaign.CampaignStore()
+
+# Potongan store kampanye untuk filter tertentu; dibagi antar sesi lewat store dataset.
+# Potongan tambahan (pin=False) tidak menggantikan referensi sesi ke potongan utamanya.
+def load_campaign_slice(campaign_store, query_filters, pin=True):
+    slice_hash = campaign.slice_key(campaign_store.version(), query_filters)
+    return slice_hash, get_dataset_store().get_or_load(slice_hash, lambda: campaign_store.query(**query_filters),
+                                                       get_session_id() if pin else None)
+
+# Pastikan kolom wajib tersedia; tampilkan peringatan dan kembalikan False jika tidak
+def check_columns(df):
+    # Pastikan kolom tanggal tersedia (Tanggal, Bulan dan Tanggal_str sudah diturunkan saat ingest)
+    if 'Tanggal' not in df.columns:
+        st.warning("Kolom 'Tanggal' tidak ditemukan dalam file CSV.")
+        return False
+        
+    # Pastikan kolom Jenis Pengukuran tersedia
+    if 'Jenis Pengukuran' not in df.columns:
+        st.warning("Kolom 'Jenis Pengukuran' tidak ditemukan dalam file CSV.")
+        return False
+       
+    # Pastikan kolom koordinat tersedia
+    if 'Latitude' not in df.columns or 'Longitude' not in df.columns:
+        st.warning("Kolom 'Latitude' dan/atau 'Longitude' tidak ditemukan dalam file CSV.")
+        return False
+    return True
+
+# Hash isi file dihitung sekali per upload, bukan di setiap rerun
+def get_file_hash(file):
+    key = f"file_hash_{file.file_id}"
+    if key not in st.session_state:
+        st.session_state[key] = ingest.content_hash(file.getvalue())
+    return st.session_state[key]
+
+# Muat data dari upload atau path di server; path di server selalu di-ingest bertahap
+def load_source(uploaded_file, server_path, stream_mode, memory_mb):
+    prune_dataset_store()
+    if uploaded_file is not None:
+        file_hash = get_file_hash(uploaded_file)
+        if not stream_mode:
+            return file_hash, load_data(file_hash, uploaded_file)
+        source = uploaded_file
+    else:
+        file_hash = streaming.path_hash(server_path)
+        source = server_path
+    
+    if not streaming.is_ingested(file_hash):
+        progress_bar = st.progress(0.0, text="Memuat data bertahap...")
+        streaming.stream_ingest(source, file_hash, memory_mb,
+                                progress=lambda f: progress_bar.progress(f, text=f"Memuat data bertahap... {f:.0%}"))
+        progress_bar.empty()
+    return file_hash, load_dataset(file_hash)
+
+# Jumlah baris dan statistik kolom dari metadata Parquet (cadangan: dihitung dari frame)
 @st.cache_data
-def load_data(file):
-    df = pd.read_csv(file)
-    return df
+def load_store_stats(file_hash, _df):
+    paths = viewer.store_files(file_hash)
+    return viewer.metadata_stats(paths) if paths else viewer.frame_stats(_df)
+
+# Hasil pencarian/pengurutan disimpan sebagai array posisi read-only
+@st.cache_resource(max_entries=16)
+def load_raw_rows(file_hash, _df, search, sort_by, ascending):
+    return viewer.matching_rows(_df, search, sort_by, ascending)
+
+# Penampil data mentah per halaman: hanya jendela yang terlihat yang dikirim ke browser
+def show_raw_data(file_hash, df):
+    n_rows, stats = load_store_stats(file_hash, df)
+    st.caption(f"Total {n_rows:,} baris, {len(df.columns)} kolom.")
+    with st.expander("Statistik kolom"):
+        st.dataframe(stats, hide_index=True)
+    
+    kolom_semua = df.columns.tolist()
+    c1, c2, c3, c4 = st.columns([3, 3, 2, 2])
+    search = c1.text_input("Cari teks:", key="raw_search").strip()
+    columns = c2.multiselect("Kolom:", kolom_semua, default=kolom_semua, key="raw_columns")
+    sort_by = c3.selectbox("Urutkan berdasarkan:", ['(tanpa urutan)'] + kolom_semua, key="raw_sort")
+    ascending = c3.checkbox("Urutan naik", value=True, key="raw_ascending")
+    page_size = c4.selectbox("Baris per halaman:", viewer.PAGE_SIZES, index=1, key="raw_page_size")
+    
+    rows = load_raw_rows(file_hash, df, search, None if sort_by == '(tanpa urutan)' else sort_by, ascending)
+    n_pages = max(math.ceil(len(rows) / page_size), 1)
+    page_number = c4.number_input(f"Halaman (dari {n_pages:,}):", min_value=1, max_value=n_pages, value=1, key="raw_page")
+    
+    if search:
+        st.caption(f"{len(rows):,} baris cocok dengan pencarian '{search}'.")
+    st.dataframe(viewer.page(df, rows, columns, page_number, page_size))
 
 st.set_page_config(page_title="QoE SIGMON", page_icon="📊:bar_chart:", layout="wide")
 
@@ -79,396 +250,447 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-# Definisi Warna Operator
-color_map = {
-    'Telkomsel': 'red',
-    'XL Axiata': 'blue',
-    'IOH': 'yellow'
-}
+# Panel waterfall per tahap + penulisan satu baris log JSON per rerun
+def show_profile(profiler):
+    record = profiler.finish()
+    if record is None:
+        return
+    profiling.write_log(record)
+    with st.expander(f"Profiling per tahap ({record['total_ms']:.0f} ms)", expanded=True):
+        if profiler.stages:
+            st.plotly_chart(profiling.waterfall_figure(profiler.stages))
+        st.dataframe(profiler.frame(), hide_index=True)
+        st.caption(f"Log: {profiling.LOG_PATH}")
 
 def main():
+    # Profiling opsional (toggle sidebar atau QOE_PROFILE=1); setiap tahap dicatat berurutan
+    profiler = profiling.Profiler(st.sidebar.toggle("Profiling per tahap", value=profiling.ENABLED))
+    if "profile_session" not in st.session_state:
+        st.session_state["profile_session"] = os.urandom(8).hex()
+    profiler.context["session"] = st.session_state["profile_session"]
+    try:
+        render_dashboard(profiler)
+    finally:
+        show_profile(profiler)
+
+def render_dashboard(profiler):
     st.title("Visualisasi Data QoE SIGMON Operator Seluler")
+    preload = start_preload(warmup.PRELOAD_PATH) if warmup.PRELOAD_PATH else None
     
     # Upload file CSV
     uploaded_file = st.file_uploader("Unggah file CSV Anda", type="csv")
     
-    if uploaded_file is not None:
-        df = load_data(uploaded_file)
-        
-        # Pastikan kolom tanggal tersedia dan dalam format datetime
-        if 'Tanggal' in df.columns:
-            df['Tanggal'] = pd.to_datetime(df['Tanggal'])
-            df['Bulan'] = df['Tanggal'].dt.strftime('%B %Y')
-            df['Tanggal_str'] = df['Tanggal'].dt.strftime('%d-%m-%Y')  # Format tanggal untuk tooltip
-        else:
-            st.warning("Kolom 'Tanggal' tidak ditemukan dalam file CSV.")
-            return
+    # Opsi untuk log kampanye berukuran besar
+    with st.sidebar.expander("Ingest File Besar"):
+        server_path = st.text_input("Path file CSV di server:", warmup.PRELOAD_PATH).strip()
+        stream_mode = st.checkbox("Ingest bertahap (streaming)", value=False)
+        memory_mb = st.number_input("Batas memori ingest (MB):", min_value=16, value=streaming.DEFAULT_MEMORY_MB, step=16)
+        st.caption("Batas memori hanya berlaku saat membaca CSV. Setelah ingest, data bertipe dimuat utuh ke "
+                   "memori, sehingga data bertipe (jauh lebih kecil dari teks CSV) tetap harus muat di RAM.")
+    
+    if server_path and uploaded_file is None and not os.path.isfile(server_path):
+        st.warning(f"File '{server_path}' tidak ditemukan.")
+        server_path = ""
+    
+    # Store kampanye: akumulasi unggahan lintas waktu dan analisis langsung dari store
+    with st.sidebar.expander("Store Kampanye"):
+        save_to_campaign = st.checkbox("Simpan unggahan ke store kampanye", value=False)
+        campaign_mode = st.checkbox("Analisis dari store kampanye", value=False)
+        campaign_stats = get_campaign_store().stats() if save_to_campaign or campaign_mode else None
+        if campaign_stats is not None:
+            st.caption(f"{campaign_stats['rows']:,} baris dari {campaign_stats['imports']} file.")
+    
+    if campaign_mode and campaign_stats['rows'] == 0:
+        st.info("Store kampanye masih kosong. Unggah file CSV dengan opsi 'Simpan unggahan ke store kampanye'.")
+        return
+    
+    if campaign_mode or uploaded_file is not None or server_path:
+        if not campaign_mode:
+            profiler.start("load")
+            # Tunggu preload yang masih berjalan agar dataset yang sama tidak di-ingest dua kali
+            if preload is not None and preload.is_alive() and uploaded_file is None and server_path == warmup.PRELOAD_PATH:
+                with st.spinner("Menyiapkan dataset..."):
+                    preload.join()
+            if preload is not None and preload.error is not None and uploaded_file is None and server_path == warmup.PRELOAD_PATH:
+                st.warning(f"Preload '{warmup.PRELOAD_PATH}' gagal: {preload.error} (detail di log server).")
+            try:
+                file_hash, df = load_source(uploaded_file, server_path, stream_mode, memory_mb)
+            except ValueError as e:
+                st.warning(str(e))
+                return
+            profiler.context.update(file_hash=file_hash, rows=len(df))
             
-        # Pastikan kolom Jenis Pengukuran tersedia
-        if 'Jenis Pengukuran' not in df.columns:
-            st.warning("Kolom 'Jenis Pengukuran' tidak ditemukan dalam file CSV.")
-            return
-           
-        # Pastikan kolom koordinat tersedia
-        if 'Latitude' not in df.columns or 'Longitude' not in df.columns:
-            st.warning("Kolom 'Latitude' dan/atau 'Longitude' tidak ditemukan dalam file CSV.")
-            return
+            if not check_columns(df):
+                return
             
-        # Tampilkan data frame
-        st.subheader("Data mentah")
-        st.dataframe(df)
+            # Tambahkan unggahan ke store kampanye (sekali per file; baris duplikat diabaikan store)
+            if save_to_campaign and st.session_state.get("campaign_saved") != file_hash:
+                profiler.start("simpan_kampanye")
+                nama = uploaded_file.name if uploaded_file is not None else server_path
+                added, duplicates = get_campaign_store().append(df, file_hash, nama)
+                st.session_state["campaign_saved"] = file_hash
+                st.sidebar.success(f"Store kampanye: {added:,} baris baru, {duplicates:,} duplikat diabaikan.")
         
-        # Filter Bulan
-        bulan_unik = ['Semua'] + df['Bulan'].unique().tolist()  # Tambahkan "Semua" ke daftar bulan unik
-        bulan_terpilih = st.selectbox("Pilih Bulan:", bulan_unik, index=0)
+        # Tampilkan data frame (pada mode store kampanye diisi setelah potongan data dimuat)
+        raw_section = st.container()
+        if not campaign_mode:
+            profiler.start("data_mentah")
+            with raw_section:
+                st.subheader("Data mentah")
+                show_raw_data(file_hash, df)
         
-        if bulan_terpilih == 'Semua':  # Cek apakah memilih semua bulan
-            df_filtered = df.copy()  # jika dipilih semua bulan maka semua data akan ditampilkan
-        else:
-            df_filtered = df[df['Bulan'] == bulan_terpilih]
+        profiler.start("filter")
+        if campaign_mode:
+            # Filter Bulan / Kabupaten / Lokasi / Parameter dijalankan sebagai query di store kampanye;
+            # hanya potongan yang cocok yang dimuat ke memori
+            campaign_store = get_campaign_store()
+            bulan_unik = ['Semua'] + campaign_store.months()
+            bulan_terpilih = st.selectbox("Pilih Bulan:", bulan_unik, index=0)
+            query_filters = {'bulan': None if bulan_terpilih == 'Semua' else bulan_terpilih}
             
-        # Filter Kabupaten/Kota
-        if 'Kabupaten/Kota' in df.columns:
-            kabupaten_unik = df_filtered['Kabupaten/Kota'].unique().tolist()
+            kabupaten_unik = campaign_store.distinct('Kabupaten/Kota', **query_filters)
             kabupaten_terpilih = st.multiselect("Pilih Kabupaten/Kota:", kabupaten_unik, default=kabupaten_unik)
+            if kabupaten_terpilih:
+                query_filters['kabupaten'] = kabupaten_terpilih
             
-            if kabupaten_terpilih:  # Cek apakah ada kabupaten/kota yang dipilih
-                df_filtered = df_filtered[df_filtered['Kabupaten/Kota'].isin(kabupaten_terpilih)]
-            else:
-                df_filtered = df_filtered.copy()  # Jika tidak ada yang dipilih, gunakan semua data
+            lokasi_unik = campaign_store.distinct('Alamat', **query_filters)
+            lokasi_terpilih = st.multiselect("Pilih Lokasi:", lokasi_unik, default=lokasi_unik)
+            if set(lokasi_terpilih) != set(lokasi_unik):
+                query_filters['alamat'] = lokasi_terpilih
+            
+            # Parameter terpilih dibaca dari state selectbox parameter (dirender di sidebar di bawah)
+            parameter_kampanye = {}
+            for jenis, key in [('Route Test', 'parameter_route'), ('Static Test', 'parameter_static')]:
+                opsi = campaign_store.distinct('Parameter', jenis=jenis, **query_filters)
+                terpilih = st.session_state.get(key)
+                parameter_kampanye[jenis] = (opsi, terpilih if terpilih in opsi else (opsi[0] if opsi else None))
+            query_filters['parameters'] = [(jenis, p) for jenis, (_, p) in parameter_kampanye.items() if p is not None]
+            
+            profiler.start("load")
+            file_hash, df = load_campaign_slice(campaign_store, query_filters)
+            profiler.context.update(file_hash=file_hash, rows=len(df))
+            with raw_section:
+                st.subheader("Data mentah (potongan store kampanye)")
+                show_raw_data(file_hash, df)
+            
+            # Indeks filter untuk potongan: seluruh baris sudah cocok dengan filter di atas
+            filter_index = load_filter_index(file_hash, df)
+            rows_filtered = None
         else:
-            st.warning("Kolom 'Kabupaten/Kota' tidak ditemukan dalam file CSV.")
-            df_filtered = df_filtered.copy()
+            # Indeks filter dibangun sekali per file; filter menghasilkan posisi baris (None = semua baris)
+            filter_index = load_filter_index(file_hash, df)
+        
+            # Filter Bulan
+            bulan_unik = ['Semua'] + filter_index.unique('Bulan')  # Tambahkan "Semua" ke daftar bulan unik
+            bulan_terpilih = st.selectbox("Pilih Bulan:", bulan_unik, index=0)
+        
+            if bulan_terpilih == 'Semua':  # Cek apakah memilih semua bulan
+                rows_filtered = None  # jika dipilih semua bulan maka semua data akan ditampilkan
+            else:
+                rows_filtered = filter_index.rows_for('Bulan', [bulan_terpilih])
+            
+            # Filter Kabupaten/Kota
+            if 'Kabupaten/Kota' in df.columns:
+                kabupaten_unik = filter_index.unique('Kabupaten/Kota', rows_filtered)
+                kabupaten_terpilih = st.multiselect("Pilih Kabupaten/Kota:", kabupaten_unik, default=kabupaten_unik)
             
-        # Pilih lokasi
-        lokasi_unik = df_filtered['Alamat'].unique().tolist()
-        lokasi_terpilih = st.multiselect("Pilih Lokasi:", lokasi_unik, default=lokasi_unik)
+                if kabupaten_terpilih:  # Cek apakah ada kabupaten/kota yang dipilih
+                    rows_filtered = filter_index.filter(rows_filtered, 'Kabupaten/Kota', kabupaten_terpilih)
+                # Jika tidak ada yang dipilih, gunakan semua data
+            else:
+                st.warning("Kolom 'Kabupaten/Kota' tidak ditemukan dalam file CSV.")
+            
+            # Pilih lokasi
+            lokasi_unik = filter_index.unique('Alamat', rows_filtered)
+            lokasi_terpilih = st.multiselect("Pilih Lokasi:", lokasi_unik, default=lokasi_unik)
                
-        # Filter data berdasarkan lokasi yang dipilih
-        df_filtered = df_filtered[df_filtered['Alamat'].isin(lokasi_terpilih)]
+            # Filter data berdasarkan lokasi yang dipilih
+            rows_filtered = filter_index.filter(rows_filtered, 'Alamat', lokasi_terpilih)
         
         # Operator seluler - pastikan ketiga operator tersedia dalam dataframe
-        operator_unik = ['Telkomsel', 'IOH', 'XL Axiata']
+        operator_unik = list(ingest.OPERATOR_COLUMNS)
+        
+        # Ringkasan nilai tertinggi/terendah diambil dari kubus agregat selama semua lokasi
+        # dipilih; jika sebagian lokasi dibatalkan, ringkasan dihitung dari data terfilter
+        profiler.start("kubus")
+        data_cube = load_cube(file_hash, df)
+        data_long, data_dims = load_long(file_hash, df)
+        cube_ok = set(lokasi_terpilih) == set(lokasi_unik)
+        cube_bulan = None if bulan_terpilih == 'Semua' else bulan_terpilih
+        cube_kabupaten = kabupaten_terpilih if 'Kabupaten/Kota' in df.columns and kabupaten_terpilih else None
+        
+        def get_summary(rows, parameter, jenis_pengukuran):
+            if cube_ok:
+                return cube.query(data_cube, operator_unik, parameter, jenis_pengukuran, cube_bulan, cube_kabupaten)
+            return cube.summarize(df.take(rows), operator_unik)
        
         # Periksa keberadaan kolom operator
         for op in operator_unik:
-            if op not in df_filtered.columns:
+            if op not in df.columns:
                 st.warning(f"Kolom operator '{op}' tidak ditemukan dalam dataset.")
        
         # Pisahkan data berdasarkan jenis pengukuran
-        df_route_test = df_filtered[df_filtered['Jenis Pengukuran'] == 'Route Test']
-        df_static_test = df_filtered[df_filtered['Jenis Pengukuran'] == 'Static Test']
+        profiler.start("filter_parameter")
+        rows_route_test = filters.intersect(rows_filtered, filter_index.rows_for('Jenis Pengukuran', ['Route Test']))
+        rows_static_test = filters.intersect(rows_filtered, filter_index.rows_for('Jenis Pengukuran', ['Static Test']))
         
         # Parameter untuk Route Test
         st.sidebar.subheader("Parameter Route Test")
-        parameter_unik_route = df_route_test['Parameter'].unique().tolist() if not df_route_test.empty else []
-        parameter_terpilih_route = st.sidebar.selectbox("Pilih Parameter Route Test:", parameter_unik_route if parameter_unik_route else ['Tidak ada data'])
+        parameter_unik_route = parameter_kampanye['Route Test'][0] if campaign_mode else filter_index.unique('Parameter', rows_route_test)
+        parameter_terpilih_route = st.sidebar.selectbox("Pilih Parameter Route Test:", parameter_unik_route if parameter_unik_route else ['Tidak ada data'],
+                                                        key="parameter_route")
+        rows_route = filters.intersect(rows_route_test, filter_index.rows_for('Parameter', [parameter_terpilih_route]))
         
         # Parameter untuk Static Test
         st.sidebar.subheader("Parameter Static Test")
-        parameter_unik_static = df_static_test['Parameter'].unique().tolist() if not df_static_test.empty else []
-        parameter_terpilih_static = st.sidebar.selectbox("Pilih Parameter Static Test:", parameter_unik_static if parameter_unik_static else ['Tidak ada data'])
+        parameter_unik_static = parameter_kampanye['Static Test'][0] if campaign_mode else filter_index.unique('Parameter', rows_static_test)
+        parameter_terpilih_static = st.sidebar.selectbox("Pilih Parameter Static Test:", parameter_unik_static if parameter_unik_static else ['Tidak ada data'],
+                                                         key="parameter_static")
+        rows_static = filters.intersect(rows_static_test, filter_index.rows_for('Parameter', [parameter_terpilih_static]))
+        
+        # Mode marker peta
+        st.sidebar.subheader("Peta")
+        marker_mode = st.sidebar.radio("Mode Marker Peta:", panels.MARKER_MODES, index=0)
+        route_tracks = st.sidebar.checkbox("Route Test sebagai lintasan", value=True)
+        
+        # Kunci cache render: dataset + pilihan filter; tiap panel menambahkan parameter yang memengaruhinya
+        render_cache = get_render_cache()
+        filter_state = (file_hash, bulan_terpilih,
+                        sorted(kabupaten_terpilih) if 'Kabupaten/Kota' in df.columns else None,
+                        sorted(lokasi_terpilih))
+        
+        # Render per parameter tanpa elemen Streamlit - dipakai rerun ini maupun prakomputasi latar
+        def param_rows(jenis, parameter):
+            rows_test = rows_route_test if jenis == 'Route Test' else rows_static_test
+            return filters.intersect(rows_test, filter_index.rows_for('Parameter', [parameter]))
+        
+        def render_bar(parameter, title):
+            def render_figure():
+                fig = panels.create_bar_figure(data_long, data_dims, param_rows(title, parameter), parameter, title, operator_unik)
+                return fig.to_json() if fig is not None else None
+            return render_cache.get_or_render(rendercache.cache_key(*filter_state, 'bar', title, parameter), render_figure)
+        
+        def render_summary(parameter, jenis):
+            summary = render_cache.get_or_render(
+                rendercache.cache_key(*filter_state, 'summary', jenis, parameter),
+                lambda: pickle.dumps(get_summary(param_rows(jenis, parameter), parameter, jenis)))
+            return pickle.loads(summary)
+        
+        def render_map(param_route, param_static):
+            def render_html():
+                combined_map = panels.create_combined_map(df, data_long, data_dims,
+                                                          param_rows('Route Test', param_route), param_rows('Static Test', param_static),
+                                                          param_route, param_static, marker_mode, operator_unik,
+                                                          route_tracks=route_tracks)
+                if combined_map is None:
+                    return None
+                combined_map.add_layer_control()
+                return combined_map.to_html()
+            return render_cache.get_or_render(rendercache.cache_key(*filter_state, 'map', param_route, param_static, marker_mode, route_tracks),
+                                          render_html)
         
         # Membuat 2 kolom untuk menempatkan grafik
         col1, col2 = st.columns(2)
         
         # --- Fungsi untuk membuat grafik dan menampilkan info kualitas ---
-        def create_barchart(df, parameter, title):
-            if df.empty or parameter not in df['Parameter'].values:
+        def create_barchart(rows, parameter, title):
+            if len(rows) == 0:
                 st.write(f"Tidak ada data untuk {title}.")
                 return None
                
-            df_plot = df[df['Parameter'] == parameter].melt(
-                id_vars=['Alamat', 'Tanggal', 'Bulan', 'Jenis Pengukuran', 'Parameter', 'Tanggal_str', 'Latitude', 'Longitude'] +
-                        (['Kabupaten/Kota'] if 'Kabupaten/Kota' in df.columns else []),
-                value_vars=[op for op in operator_unik if op in df.columns],
-                var_name='Operator',
-                value_name='Nilai'
-            )
+            # Figur diambil dari cache render jika filter dan parameter panel ini tidak berubah
+            fig_json = render_bar(parameter, title)
            
-            if not df_plot.empty:
-                # Map warna ke operator
-                color_discrete_map = {op: color_map[op] for op in operator_unik if op in color_map}
-           
-                fig = px.bar(df_plot, x='Alamat', y='Nilai', color='Operator', barmode='group',
-                             title=f"{parameter} ({title})",
-                             hover_data=['Operator', 'Alamat', 'Tanggal_str', 'Nilai'],
-                             color_discrete_map=color_discrete_map)
-               
-                # Menyesuaikan tata letak plot
-                fig.update_layout(
-                    xaxis_title="Lokasi",
-                    yaxis_title=parameter,
-                    legend_title="Operator"
-                )
-               
-                st.plotly_chart(fig)
+            if fig_json is not None:
+                st.plotly_chart(pio.from_json(fig_json))
                
-                # Analisis nilai tertinggi dan terendah untuk setiap operator dan lokasi
-                if pd.api.types.is_numeric_dtype(df_plot['Nilai']):
-                    # Cari nilai tertinggi dan terendah di seluruh dataset
-                    max_row = df_plot.loc[df_plot['Nilai'].idxmax()]
-                    min_row = df_plot.loc[df_plot['Nilai'].idxmin()]
-                    
+                # Analisis nilai tertinggi dan terendah untuk setiap operator dan lokasi (lookup kubus)
+                max_row, min_row = cube.extremes(render_summary(parameter, title))
+                if max_row is not None:
                     # Tampilkan informasi tentang operator dan lokasi dengan nilai tertinggi dan terendah
-                    st.markdown(f"**Nilai {parameter} Tertinggi:** {max_row['Operator']} di lokasi {max_row['Alamat']} ({max_row['Nilai']:.2f})")
-                    st.markdown(f"**Nilai {parameter} Terendah:** {min_row['Operator']} di lokasi {min_row['Alamat']} ({min_row['Nilai']:.2f})")
+                    st.markdown(f"**Nilai {parameter} Tertinggi:** {max_row['Operator']} di lokasi {max_row['max_alamat']} ({max_row['max']:.2f})")
+                    st.markdown(f"**Nilai {parameter} Terendah:** {min_row['Operator']} di lokasi {min_row['min_alamat']} ({min_row['min']:.2f})")
                 else:
                     st.write(f"Nilai tertinggi dan terendah tidak dapat ditentukan karena parameter bukan data numerik.")                
                
-                return df_plot
+                return fig_json
             else:
                 st.write(f"Tidak ada data untuk {title}.")
                 return None
                 
         # --- Membuat grafik Route Test ---
+        profiler.start("grafik_route")
         with col1:
             st.subheader(f"Grafik {parameter_terpilih_route} (Route Test)")
-            df_plot_route = create_barchart(df_route_test, parameter_terpilih_route, "Route Test")
+            fig_route = create_barchart(rows_route, parameter_terpilih_route, "Route Test")
             
         # --- Membuat grafik Static Test ---
+        profiler.start("grafik_static")
         with col2:
             st.subheader(f"Grafik {parameter_terpilih_static} (Static Test)")
-            df_plot_static = create_barchart(df_static_test, parameter_terpilih_static, "Static Test")
+            fig_static = create_barchart(rows_static, parameter_terpilih_static, "Static Test")
         
         # ----- PETA GABUNGAN UNTUK ROUTE TEST DAN STATIC TEST -----
+        profiler.start("peta")
         st.subheader("Peta Lokasi QoE SIGMON (Route Test & Static Test)")
        
-        # Fungsi untuk membuat peta gabungan dengan kedua jenis pengukuran dan animasi kedip
-        def create_combined_map(df_route, df_static, param_route, param_static):
-            # Cek apakah ada data untuk ditampilkan
-            has_route_data = not df_route.empty and param_route in df_route['Parameter'].values
-            has_static_data = not df_static.empty and param_static in df_static['Parameter'].values
-           
-            if not has_route_data and not has_static_data:
-                st.write("Tidak ada data untuk ditampilkan pada peta.")
-                return None
-           
-            # Filter data berdasarkan parameter yang dipilih
-            df_route_map = df_route[df_route['Parameter'] == param_route] if has_route_data else pd.DataFrame()
-            df_static_map = df_static[df_static['Parameter'] == param_static] if has_static_data else pd.DataFrame()
-           
-            # Gabungkan data untuk menentukan titik tengah peta
-            df_combined = pd.concat([df_route_map, df_static_map])
-           
-            if df_combined.empty:
-                st.write("Tidak ada data untuk parameter yang dipilih.")
-                return None
-           
-            # Menghitung nilai tengah koordinat untuk titik awal peta
-            center_lat = df_combined['Latitude'].mean()
-            center_lon = df_combined['Longitude'].mean()
-           
-            # Buat peta dengan leafmap - set zoom awal lebih jauh (nilai zoom lebih kecil)
-            m = leafmap.Map(center=[center_lat, center_lon], zoom=8)
-            # Tambahkan basemap
-            m.add_basemap("OpenStreetMap")
-            
-            # Tambahkan CSS untuk animasi kedip ke peta
-            folium.Element("""
-            <style>
-                @keyframes pulse {
-                    0% { opacity: 1; }
-                    50% { opacity: 0.4; }
-                    100% { opacity: 1; }
-                }
-                .marker-pulse {
-                    animation: pulse 1.5s infinite;
-                }
-                .marker-pulse-fast {
-                    animation: pulse 0.8s infinite;
-                }
-            </style>
-            """).add_to(m)
-           
-            # Membuat grup marker untuk clustering titik-titik yang berdekatan
-            marker_cluster = MarkerCluster().add_to(m)
-           
-            # Fungsi untuk membuat ikon berdasarkan jenis test dan operator dengan efek kedipan
-            def create_custom_icon(jenis_test, operator, nilai):
-                # Tentukan warna berdasarkan operator
-                color = color_map.get(operator, 'gray')
-                
-                # Tentukan jenis ikon dan kelas animasi berdasarkan jenis test
-                if jenis_test == 'Route Test':
-                    # Untuk Route Test, gunakan ikon pin lokasi dengan animasi pulse
-                    icon_html = f"""
-                    <div class="marker-pulse" style="animation-delay: {(hash(operator) % 5) * 0.2}s;">
-                        <i class="fa fa-map-marker fa-2x" style="color:{color};"></i>
-                    </div>
-                    """
-                    return folium.DivIcon(
-                        html=icon_html,
-                        icon_size=(30, 30),
-                        icon_anchor=(15, 30)
-                    )
-                else:
-                    # Untuk Static Test, gunakan ikon wifi dengan animasi pulse
-                    icon_html = f"""
-                    <div class="marker-pulse-fast" style="animation-delay: {(hash(operator) % 3) * 0.3}s;">
-                        <i class="fa fa-wifi fa-2x" style="color:{color};"></i>
-                    </div>
-                    """
-                    return folium.DivIcon(
-                        html=icon_html,
-                        icon_size=(30, 30),
-                        icon_anchor=(15, 15)
-                    )
-           
-            # Tambahkan marker untuk Route Test dengan animasi
-            if has_route_data:
-                for op in [op for op in operator_unik if op in df_route_map.columns]:
-                    # Filter data untuk operator ini yang tidak null
-                    op_data = df_route_map.copy()
-                    op_data = op_data[op_data[op].notna()]
-                   
-                    if not op_data.empty:
-                        for _, row in op_data.iterrows():
-                            # Format nilai untuk tampilan
-                            nilai = row[op]
-                            nilai_str = f"{nilai:.2f}" if isinstance(nilai, (int, float)) else str(nilai)
-                           
-                            popup_content = f"""
-                            <div style="font-family: Arial; font-size: 12px;">
-                                <b>Jenis Pengukuran:</b> Route Test<br>
-                                <b>Lokasi:</b> {row['Alamat']}<br>
-                                <b>Operator:</b> {op}<br>
-                                <b>Parameter:</b> {param_route}<br>
-                                <b>Nilai:</b> {nilai_str}<br>
-                                <b>Tanggal:</b> {row['Tanggal_str']}<br>
-                                {"<b>Kabupaten/Kota:</b> " + row['Kabupaten/Kota'] + "<br>" if 'Kabupaten/Kota' in op_data.columns else ""}
-                            </div>
-                            """
-                           
-                            # Buat marker dengan custom icon dan animasi
-                            folium.Marker(
-                                location=[row['Latitude'], row['Longitude']],
-                                icon=create_custom_icon('Route Test', op, nilai),
-                                popup=folium.Popup(popup_content, max_width=300),
-                                tooltip=f"Route Test: {op} - {row['Alamat']}"
-                            ).add_to(marker_cluster)
-           
-            # Tambahkan marker untuk Static Test dengan animasi
-            if has_static_data:
-                for op in [op for op in operator_unik if op in df_static_map.columns]:
-                    # Filter data untuk operator ini yang tidak null
-                    op_data = df_static_map.copy()
-                    op_data = op_data[op_data[op].notna()]
-                   
-                    if not op_data.empty:
-                        for _, row in op_data.iterrows():
-                            # Format nilai untuk tampilan
-                            nilai = row[op]
-                            nilai_str = f"{nilai:.2f}" if isinstance(nilai, (int, float)) else str(nilai)
-                           
-                            popup_content = f"""
-                            <div style="font-family: Arial; font-size: 12px;">
-                                <b>Jenis Pengukuran:</b> Static Test<br>
-                                <b>Lokasi:</b> {row['Alamat']}<br>
-                                <b>Operator:</b> {op}<br>
-                                <b>Parameter:</b> {param_static}<br>
-                                <b>Nilai:</b> {nilai_str}<br>
-                                <b>Tanggal:</b> {row['Tanggal_str']}<br>
-                                {"<b>Kabupaten/Kota:</b> " + row['Kabupaten/Kota'] + "<br>" if 'Kabupaten/Kota' in op_data.columns else ""}
-                            </div>
-                            """
-                           
-                            # Buat marker dengan custom icon dan animasi
-                            folium.Marker(
-                                location=[row['Latitude'], row['Longitude']],
-                                icon=create_custom_icon('Static Test', op, nilai),
-                                popup=folium.Popup(popup_content, max_width=300),
-                                tooltip=f"Static Test: {op} - {row['Alamat']}"
-                            ).add_to(marker_cluster)
-           
-            # Tambahkan legenda untuk operator dan jenis pengukuran
-            legend_html = """
-            <div style="position: fixed; bottom: 50px; right: 50px; z-index: 1000; background-color: white;
-                        padding: 10px; border: 2px solid grey; border-radius: 5px">
-                <div style="margin-bottom: 5px;"><b>Operator:</b></div>
-            """
-           
-            # Legenda untuk operator dengan animasi
-            for op in operator_unik:
-                legend_html += f"""
-                <div style="margin-bottom: 3px;">
-                    <i style="background:{color_map.get(op, 'gray')}; width: 12px; height: 12px; display: inline-block; border: 1px solid black;" 
-                       class="marker-pulse"></i> {op}
-                </div>
-                """
-           
-            # Legenda untuk jenis pengukuran dengan animasi
-            legend_html += """
-                <div style="margin-top: 10px; margin-bottom: 5px;"><b>Jenis Pengukuran:</b></div>
-                <div style="margin-bottom: 3px;" class="marker-pulse"><i class="fa fa-map-marker" style="color:gray;"></i> Route Test</div>
-                <div style="margin-bottom: 3px;" class="marker-pulse-fast"><i class="fa fa-wifi" style="color:gray;"></i> Static Test</div>
-            </div>
-            """
-           
-            m.add_html(html=legend_html, position="bottomright")
-           
-            return m
-            
         # Buat dan tampilkan peta gabungan dengan ikon berkedip
-        combined_map = create_combined_map(df_route_test, df_static_test, parameter_terpilih_route, parameter_terpilih_static)
-        if combined_map:
-            combined_map.to_streamlit(height=500)
+        # (HTML peta diambil dari cache render jika filter, parameter dan mode marker tidak berubah)
+        map_html = render_map(parameter_terpilih_route, parameter_terpilih_static)
+        if map_html:
+            components.html(map_html, height=500)
         else:
             st.write("Tidak ada data untuk ditampilkan pada peta gabungan.")
             
         # Tambahkan ringkasan perbandingan untuk setiap parameter
+        profiler.start("perbandingan")
         st.subheader("Ringkasan Perbandingan Parameter Antar Operator")
         
         # Fungsi untuk membuat tabel perbandingan lokasi terbaik dan terburuk
-        def create_location_comparison(df, parameter, test_type):
-            if df.empty or parameter not in df['Parameter'].values:
+        def create_location_comparison(rows, parameter, test_type):
+            if len(rows) == 0:
                 return None
                 
-            df_param = df[df['Parameter'] == parameter].copy()
-            
-            # Buat DataFrame hasil untuk menyimpan nilai tertinggi dan terendah per operator dan lokasi
-            comparison_data = []
-            
-            # Untuk setiap operator
-            for op in [op for op in operator_unik if op in df_param.columns]:
-                op_data = df_param[['Alamat', 'Tanggal_str', op]].dropna()
-                
-                if not op_data.empty and pd.api.types.is_numeric_dtype(op_data[op]):
-                    # Lokasi dengan nilai tertinggi
-                    max_idx = op_data[op].idxmax()
-                    max_row = op_data.loc[max_idx]
-                    
-                    # Lokasi dengan nilai terendah
-                    min_idx = op_data[op].idxmin()
-                    min_row = op_data.loc[min_idx]
-                    
-                    comparison_data.append({
-                        'Operator': op,
-                        'Parameter': parameter,
-                        'Jenis Test': test_type,
-                        'Nilai Tertinggi': max_row[op],
-                        'Lokasi Tertinggi': max_row['Alamat'],
-                        'Tanggal Tertinggi': max_row['Tanggal_str'],
-                        'Nilai Terendah': min_row[op],
-                        'Lokasi Terendah': min_row['Alamat'],
-                        'Tanggal Terendah': min_row['Tanggal_str']
-                    })
-            
-            return pd.DataFrame(comparison_data) if comparison_data else None
+            # Nilai tertinggi dan terendah per operator diambil dari ringkasan kubus
+            return cube.comparison_table(render_summary(parameter, test_type), parameter, test_type)
         
         # Buat perbandingan untuk Route Test
-        if not df_route_test.empty and parameter_terpilih_route in df_route_test['Parameter'].values:
-            route_comparison = create_location_comparison(df_route_test, parameter_terpilih_route, "Route Test")
+        if len(rows_route) > 0:
+            route_comparison = create_location_comparison(rows_route, parameter_terpilih_route, "Route Test")
             if route_comparison is not None:
                 st.markdown(f"##### Perbandingan {parameter_terpilih_route} (Route Test)")
                 st.dataframe(route_comparison)
         
         # Buat perbandingan untuk Static Test
-        if not df_static_test.empty and parameter_terpilih_static in df_static_test['Parameter'].values:
-            static_comparison = create_location_comparison(df_static_test, parameter_terpilih_static, "Static Test")
+        if len(rows_static) > 0:
+            static_comparison = create_location_comparison(rows_static, parameter_terpilih_static, "Static Test")
             if static_comparison is not None:
                 st.markdown(f"##### Perbandingan {parameter_terpilih_static} (Static Test)")
                 st.dataframe(static_comparison)
+        
+        # Perubahan Before/After (kolom Keterangan) untuk semua parameter dan operator sekaligus.
+        # Filter Bulan tidak membatasi baris karena fase Before dan After umumnya jatuh pada bulan
+        # berbeda; yang disejajarkan adalah seluruh pengukuran di lokasi terpilih. Pada mode store
+        # kampanye potongan utama sudah dibatasi Bulan dan parameter terpilih, sehingga panel ini
+        # memakai agregasi tersendiri di store yang hanya dibatasi Alamat.
+        profiler.start("before_after")
+        st.subheader("Perubahan Before/After per Lokasi")
+        if campaign_mode:
+            # Rata-rata per fase diagregasi di SQLite; klausa Alamat hanya jika tidak semua lokasi dipilih
+            alamat_filters = ({} if set(lokasi_terpilih) == set(campaign_store.distinct('Alamat'))
+                              else {'alamat': lokasi_terpilih})
+            before_after_key = rendercache.cache_key(campaign.slice_key(campaign_store.version(), alamat_filters), 'before_after')
+            build_deltas = lambda: beforeafter.deltas_from_means(beforeafter.means_from_sums(
+                campaign_store.phase_sums(ingest.OPERATOR_COLUMNS, **alamat_filters)))
+        else:
+            rows_before_after = filter_index.filter(None, 'Alamat', lokasi_terpilih)
+            before_after_key = rendercache.cache_key(*filter_state, 'before_after')
+            build_deltas = lambda: beforeafter.build_deltas(data_long, data_dims, rows_before_after)
+        deltas = pickle.loads(render_cache.get_or_render(before_after_key, lambda: pickle.dumps(build_deltas())))
+        
+        if deltas.empty:
+            st.write("Tidak ada pasangan pengukuran Before/After pada lokasi terpilih.")
+        else:
+            st.caption(f"{len(deltas):,} pasangan (lokasi, parameter, operator). Perbaikan (%) bertanda sesuai arah "
+                       "kualitas parameter: positif = membaik, negatif = memburuk.")
+            jumlah_peringkat = st.number_input("Jumlah peringkat:", min_value=1, max_value=100, value=10, step=1)
+            col_membaik, col_memburuk = st.columns(2)
+            with col_membaik:
+                st.markdown("##### Paling Membaik")
+                st.dataframe(beforeafter.top_k(deltas, jumlah_peringkat, improved=True), hide_index=True)
+            with col_memburuk:
+                st.markdown("##### Paling Memburuk")
+                st.dataframe(beforeafter.top_k(deltas, jumlah_peringkat, improved=False), hide_index=True)
+            st.markdown("##### Median Perbaikan (%) per Parameter")
+            st.dataframe(beforeafter.parameter_summary(deltas, operator_unik))
+
+        # Skor QoE gabungan per (lokasi, operator) lintas semua parameter Speed/Web/Video/Route Test:
+        # satu pivot rata-rata, normalisasi persentil sesuai arah kualitas, peringkat via argpartition.
+        # Pada mode store kampanye dipakai potongan dengan filter yang sama tanpa filter parameter.
+        profiler.start("scoring")
+        st.subheader("Skor QoE Gabungan per Lokasi dan Operator")
+        if campaign_mode:
+            slice_filters = {key: value for key, value in query_filters.items() if key != 'parameters'}
+            slice_hash, slice_df = load_campaign_slice(campaign_store, slice_filters, pin=False)
+            scoring_long, scoring_dims = load_long(slice_hash, slice_df)
+            rows_scoring = None
+            scoring_key = rendercache.cache_key(slice_hash, 'skor_qoe')
+        else:
+            scoring_long, scoring_dims = data_long, data_dims
+            rows_scoring = rows_filtered
+            scoring_key = rendercache.cache_key(*filter_state, 'skor_qoe')
+        skor = pickle.loads(render_cache.get_or_render(
+            scoring_key,
+            lambda: pickle.dumps(scoring.composite_scores(scoring.parameter_matrix(scoring_long, scoring_dims, rows_scoring)))))
+
+        if skor.empty:
+            st.write("Tidak ada data untuk menghitung skor QoE.")
+        else:
+            st.caption(f"{len(skor):,} kombinasi (lokasi, operator). Setiap parameter dinormalisasi menjadi persentil "
+                       "0-100 sesuai arah kualitasnya (mis. DL speed makin tinggi makin baik, load time makin rendah "
+                       "makin baik); skor gabungan = rata-rata skor per jenis Test. Nilai 0 dianggap tidak terukur.")
+            jumlah_peringkat_skor = st.number_input("Jumlah peringkat skor:", min_value=1, max_value=100, value=10, step=1)
+            col_terbaik, col_terburuk = st.columns(2)
+            with col_terbaik:
+                st.markdown("##### Skor Tertinggi")
+                st.dataframe(scoring.top_k(skor, jumlah_peringkat_skor, best=True), hide_index=True)
+            with col_terburuk:
+                st.markdown("##### Skor Terendah")
+                st.dataframe(scoring.top_k(skor, jumlah_peringkat_skor, best=False), hide_index=True)
+            st.markdown("##### Rata-rata Skor per Operator")
+            st.dataframe(scoring.operator_summary(skor, operator_unik))
+
+        # Catat pemilihan parameter (hanya saat berubah) untuk mengurutkan prakomputasi
+        usage = get_parameter_usage()
+        for jenis, parameter in [('Route Test', parameter_terpilih_route), ('Static Test', parameter_terpilih_static)]:
+            if st.session_state.get(f"param_terakhir_{jenis}") != parameter:
+                st.session_state[f"param_terakhir_{jenis}"] = parameter
+                usage.record(jenis, parameter)
+        
+        # Prakomputasi grafik, ringkasan dan peta untuk parameter lain (yang paling sering dipilih lebih dulu).
+        # Grafik dan ringkasan hanya bergantung pada filter, sehingga job-nya dibatalkan hanya saat
+        # Bulan / Kabupaten / Alamat berubah. Peta satu jenis dipasangkan dengan parameter terpilih
+        # jenis lainnya, sehingga job peta juga dikunci dengan parameter tersebut dan mode peta.
+        def precompute_charts(jenis, parameter):
+            render_bar(parameter, jenis)
+            render_summary(parameter, jenis)
+        
+        def submit_job(name, key, items, task):
+            job = st.session_state.get(name)
+            if job is None or job.key != key:
+                if job is not None:
+                    job.cancel()
+                tasks = [functools.partial(task, jenis, parameter) for jenis, parameter in usage.order(items)]
+                job = precompute.PrecomputeJob(key).submit(get_precompute_executor(), tasks)
+                st.session_state[name] = job
+            return job
+        
+        # Pada mode store kampanye potongan hanya berisi parameter terpilih, sehingga tidak ada yang disiapkan
+        items_route = [] if campaign_mode else [('Route Test', p) for p in parameter_unik_route if p != parameter_terpilih_route]
+        items_static = [] if campaign_mode else [('Static Test', p) for p in parameter_unik_static if p != parameter_terpilih_static]
+        map_state = (*filter_state, marker_mode, route_tracks)
+        jobs = [
+            submit_job("precompute_job", rendercache.cache_key(*filter_state, 'grafik'),
+                       items_route + items_static, precompute_charts),
+            submit_job("precompute_job_peta_route", rendercache.cache_key(*map_state, 'peta Route Test', parameter_terpilih_static),
+                       items_route, lambda jenis, parameter, static=parameter_terpilih_static: render_map(parameter, static)),
+            submit_job("precompute_job_peta_static", rendercache.cache_key(*map_state, 'peta Static Test', parameter_terpilih_route),
+                       items_static, lambda jenis, parameter, route=parameter_terpilih_route: render_map(route, parameter)),
+        ]
+        done, total = map(sum, zip(*(job.progress() for job in jobs)))
+        st.sidebar.caption(f"Prakomputasi parameter: {done}/{total} selesai")
+        
+        # Pemakaian store dataset bersama
+        store_stats = get_dataset_store().stats()
+        st.sidebar.caption(f"Store dataset: {store_stats['datasets']} dataset, "
+                           f"{store_stats['bytes'] / 2 ** 20:.1f} / {store_stats['max_bytes'] / 2 ** 20:.0f} MB, "
+                           f"{store_stats['sessions']} sesi, {store_stats['evictions']} eviksi")
+        
+        # Laporan efektivitas cache render
+        cache_stats = render_cache.stats()
+        st.sidebar.caption(f"Cache render: {cache_stats['hit_rate']:.0%} hit "
+                           f"({cache_stats['hits']} hit / {cache_stats['misses']} miss, "
+                           f"{cache_stats['entries']} entri, {cache_stats['bytes'] / 2 ** 20:.1f} MB)")
                 
     else:
         st.info("Silakan unggah file CSV untuk memulai visualisasi.")
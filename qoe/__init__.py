@@ -0,0 +1 @@
+# Modul pendukung dashboard QoE SIGMON (bts4.py)
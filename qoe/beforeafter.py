@@ -0,0 +1,139 @@
+# Mesin delta Before/After: pengukuran "Posko Before ..." dan "Posko After ..." (kolom Keterangan)
+# disejajarkan dalam satu merge pada (Alamat, Jenis Pengukuran, Parameter, Operator), lalu
+# selisih absolut dan persen dihitung untuk semua parameter dan operator sekaligus, tanpa loop
+# Python per baris. Beberapa pengukuran pada fase yang sama dirata-rata lebih dulu.
+#
+# Arah kualitas per parameter menentukan "membaik": nilai waktu/latensi (ms, Durations) makin
+# kecil makin baik, parameter lain makin besar makin baik; Distance tidak memiliki arah.
+#
+# Rata-rata per fase juga bisa disusun dari jumlah/banyaknya nilai yang sudah diagregasi di luar
+# (mis. GROUP BY di store kampanye, lihat means_from_sums), sehingga data mentah tidak dimuat.
+#
+# Nilai 0 pada data QoE berarti "tidak terukur" (mis. Initial Buffering XL Axiata hampir selalu 0),
+# bukan latensi terbaik atau throughput terburuk, sehingga diperlakukan seperti NaN.
+import numpy as np
+import pandas as pd
+
+from qoe import longtable, ranking
+
+KEYS = ['Alamat', 'Jenis Pengukuran', 'Parameter', 'Operator']
+
+# Fase dikenali dari kata "Before"/"After" di Keterangan (tidak peka huruf besar/kecil)
+PHASE_PATTERNS = [r'\bbefore\b', r'\bafter\b']
+
+LOWER_IS_BETTER_PATTERN = r'\(ms\)|^Durations$'
+NEUTRAL_PARAMETERS = ['Distance (km)']
+
+SUM_COLUMNS = KEYS[:3] + ['Keterangan', 'Operator', 'sum', 'count']
+DELTA_COLUMNS = KEYS + ['Before', 'After', 'n Before', 'n After', 'Selisih', 'Selisih (%)', 'Perbaikan (%)']
+
+
+def _category_values(series):
+    # (kode per baris, nilai kategori) tanpa mengubah kolom menjadi object
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype('category')
+    return series.cat.codes.to_numpy(), series.cat.categories.astype(str)
+
+
+def phase_codes(keterangan):
+    # 0 = Before, 1 = After, -1 = bukan bagian pasangan; dicocokkan pada kategori unik saja
+    codes, categories = _category_values(keterangan)
+    phase = np.full(len(categories), -1, dtype='int8')
+    for i, pattern in enumerate(PHASE_PATTERNS):
+        phase[np.asarray(categories.str.contains(pattern, case=False, regex=True), dtype=bool) & (phase < 0)] = i
+    # Kode -1 (Keterangan kosong) diarahkan ke slot tambahan bernilai -1
+    return np.append(phase, np.int8(-1))[codes]
+
+
+def measured(nilai):
+    # Nilai terukur: bukan NaN dan lebih besar dari 0
+    return np.isfinite(nilai) & (nilai > 0)
+
+
+def direction(parameters):
+    # +1 makin besar makin baik, -1 makin kecil makin baik, 0 tanpa arah
+    codes, categories = _category_values(pd.Series(parameters))
+    signs = np.where(np.asarray(categories.str.contains(LOWER_IS_BETTER_PATTERN, regex=True), dtype=bool), -1.0, 1.0)
+    signs[np.asarray(categories.isin(NEUTRAL_PARAMETERS))] = 0.0
+    return np.append(signs, 0.0)[codes]
+
+
+def phase_means(long, dims, rows=None):
+    # Rata-rata dan banyaknya nilai terukur per (KEYS, fase) dari tabel panjang kanonik
+    # (qoe.longtable); rows membatasi baris data yang ikut (None = semua baris)
+    if 'Keterangan' not in dims.columns or not all(k in dims.columns for k in KEYS[:3]):
+        return None
+
+    data_rows = long['row'].to_numpy()
+    nilai = long['Nilai'].to_numpy()
+    phase = phase_codes(dims['Keterangan'])[data_rows]
+    mask = (phase >= 0) & measured(nilai) & longtable.row_mask(long, dims, rows)
+
+    picked = data_rows[mask]
+    values = pd.DataFrame({key: dims[key].array.take(picked) for key in KEYS[:3]})
+    values['Operator'] = long['Operator'].array[mask]
+    values['phase'] = phase[mask]
+    # Rata-rata diakumulasi dalam float64 seperti jumlah di kubus agregat
+    values['Nilai'] = nilai[mask].astype('float64')
+
+    return (values.groupby(KEYS + ['phase'], observed=True, sort=False)['Nilai']
+            .agg(['mean', 'count']).reset_index())
+
+
+def means_from_sums(sums):
+    # Rata-rata per (KEYS, fase) dari jumlah dan banyaknya nilai terukur per (KEYS[:3], Keterangan,
+    # Operator) yang sudah diagregasi di luar (SUM_COLUMNS); beberapa Keterangan pada fase yang
+    # sama digabung dengan bobot banyaknya nilai
+    values = sums.assign(phase=phase_codes(sums['Keterangan']))
+    values = values[(values['phase'] >= 0) & (values['count'] > 0)]
+    totals = values.groupby(KEYS + ['phase'], observed=True, sort=False)[['sum', 'count']].sum().reset_index()
+    totals['mean'] = totals['sum'] / totals['count']
+    return totals.drop(columns='sum')
+
+
+def deltas_from_means(means):
+    # Sejajarkan rata-rata Before dan After dalam satu merge lalu hitung selisih dan perbaikan
+    if means is None:
+        return pd.DataFrame(columns=DELTA_COLUMNS)
+    before = means[means['phase'] == 0].drop(columns='phase')
+    after = means[means['phase'] == 1].drop(columns='phase')
+    deltas = before.merge(after, on=KEYS, how='inner', suffixes=(' Before', ' After'))
+
+    result = deltas[KEYS].copy()
+    result['Before'] = deltas['mean Before']
+    result['After'] = deltas['mean After']
+    result['n Before'] = deltas['count Before']
+    result['n After'] = deltas['count After']
+    result['Selisih'] = result['After'] - result['Before']
+    base = result['Before'].abs().to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pct = np.where(base > 0, result['Selisih'].to_numpy() / base * 100, np.nan)
+    result['Selisih (%)'] = pct
+    # Perbaikan bertanda sesuai arah kualitas: positif = membaik, negatif = memburuk
+    signs = direction(result['Parameter'])
+    result['Perbaikan (%)'] = np.where(signs != 0, pct * signs, np.nan)
+    return result.reset_index(drop=True)
+
+
+def build_deltas(long, dims, rows=None):
+    # Tabel delta dari tabel panjang kanonik; rows membatasi baris data yang ikut disejajarkan
+    return deltas_from_means(phase_means(long, dims, rows))
+
+
+def top_k(deltas, k, improved=True, column='Perbaikan (%)'):
+    # k baris paling membaik (atau paling memburuk) menurut column; hanya perubahan searah yang ikut
+    values = deltas[column].to_numpy(dtype='float64')
+    scores = values if improved else -values
+    return ranking.top_k(deltas, np.where(scores > 0, scores, np.nan), k)
+
+
+def parameter_summary(deltas, operators=None):
+    # Median perbaikan (%) per (Jenis Pengukuran, Parameter) x Operator lintas lokasi berpasangan
+    if deltas.empty:
+        return pd.DataFrame()
+    table = (deltas.groupby(['Jenis Pengukuran', 'Parameter', 'Operator'], observed=True, sort=False)['Perbaikan (%)']
+             .median().unstack('Operator'))
+    if operators is not None:
+        table = table.reindex(columns=[op for op in operators if op in table.columns])
+    table.columns = table.columns.astype(str)
+    return table.dropna(how='all')
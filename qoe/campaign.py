@@ -0,0 +1,215 @@
+# Store kampanye lokal (SQLite) untuk mengakumulasi data QoE lintas unggahan, mis. kampanye
+# "Posko Before/After Idul Fitri" pada kolom Keterangan. Setiap CSV ditambahkan secara
+# inkremental; baris duplikat (hash isi baris sama) diabaikan. Filter Bulan / Kabupaten /
+# Alamat / Parameter dijalankan sebagai query berindeks sehingga hanya potongan yang cocok
+# yang dimuat ke memori. Daftar pilihan filter (bulan, nilai unik) dan statistik store disimpan
+# di memori dengan kunci versi store, sehingga rerun tidak memindai ulang seluruh riwayat.
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from qoe import ingest
+
+SCHEMA_VERSION = 1
+DB_PATH = os.environ.get("QOE_CAMPAIGN_DB", os.path.join(ingest.CACHE_DIR, f"campaign-v{SCHEMA_VERSION}.sqlite"))
+
+# Kolom yang disimpan (Bulan dan Tanggal_str diturunkan ulang dari Tanggal saat dimuat)
+TEXT_COLUMNS = ['Hari', 'Jenis Pengukuran', 'Test', 'Parameter', 'Kabupaten/Kota', 'Alamat', 'Keterangan']
+REAL_COLUMNS = ingest.OPERATOR_COLUMNS + ['Longitude', 'Latitude']
+STORE_COLUMNS = ['Tanggal'] + TEXT_COLUMNS + REAL_COLUMNS
+
+# Kolom indeks filter: Tanggal di depan karena filter Bulan dijalankan sebagai rentang tanggal
+INDEX_COLUMNS = ['Tanggal', 'Jenis Pengukuran', 'Parameter', 'Kabupaten/Kota']
+
+# Jumlah hasil query pilihan filter yang disimpan (LRU)
+QUERY_CACHE_ENTRIES = int(os.environ.get("QOE_CAMPAIGN_QUERY_CACHE", "256"))
+
+
+def _quote(column):
+    return '"' + column.replace('"', '""') + '"'
+
+
+def _month_range(bulan):
+    # Label '%B %Y' (seperti kolom Bulan hasil ingest) -> rentang tanggal ISO [awal, akhir)
+    start = pd.to_datetime(bulan, format='%B %Y')
+    end = start + pd.offsets.MonthBegin(1)
+    return start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d')
+
+
+def slice_key(version, query_filters):
+    # Kunci potongan: versi isi store + filter query (berubah saat ada baris baru)
+    payload = json.dumps([SCHEMA_VERSION, version, query_filters], sort_keys=True, default=list, ensure_ascii=False)
+    return ingest.content_hash(payload.encode('utf-8'))
+
+
+def row_hashes(frame):
+    # Hash isi baris (tidak bergantung urutan kategori) untuk mendeteksi baris duplikat
+    hashes = pd.util.hash_pandas_object(frame[STORE_COLUMNS], index=False)
+    return hashes.to_numpy().view('int64')
+
+
+def to_store_frame(df):
+    # Frame bertipe (hasil ingest) -> kolom penyimpanan; kolom yang tidak ada diisi NULL
+    frame = pd.DataFrame(index=range(len(df)))
+    tanggal = pd.to_datetime(df['Tanggal']) if 'Tanggal' in df.columns else pd.Series(pd.NaT, index=frame.index)
+    frame['Tanggal'] = pd.Series(tanggal.dt.strftime('%Y-%m-%d').to_numpy(), dtype=object)
+    for col in TEXT_COLUMNS:
+        frame[col] = df[col].astype(object).to_numpy() if col in df.columns else None
+    for col in REAL_COLUMNS:
+        frame[col] = df[col].to_numpy(dtype='float64', na_value=np.nan) if col in df.columns else np.nan
+    frame = frame.astype({col: object for col in ['Tanggal'] + TEXT_COLUMNS})
+    return frame.where(frame.notna(), None)
+
+
+class CampaignStore:
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Satu koneksi dibagi antar thread Streamlit; akses diserialkan dengan lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._query_cache = OrderedDict()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            columns = ", ".join(
+                [f"{_quote('Tanggal')} TEXT"] +
+                [f"{_quote(col)} TEXT" for col in TEXT_COLUMNS] +
+                [f"{_quote(col)} REAL" for col in REAL_COLUMNS])
+            self._conn.execute(f"CREATE TABLE IF NOT EXISTS pengukuran (row_hash INTEGER NOT NULL UNIQUE, {columns})")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_pengukuran_filter ON pengukuran ("
+                               + ", ".join(_quote(col) for col in INDEX_COLUMNS) + ")")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_pengukuran_alamat ON pengukuran (\"Alamat\")")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS impor ("
+                               "file_hash TEXT PRIMARY KEY, nama TEXT, waktu TEXT, baris INTEGER, baris_baru INTEGER)")
+
+    def append(self, df, file_hash, name=None):
+        # Tambahkan frame bertipe; kembalikan (baris baru, duplikat diabaikan)
+        frame = to_store_frame(df)
+        hashes = row_hashes(frame)
+        placeholders = ", ".join("?" * (len(STORE_COLUMNS) + 1))
+        sql = (f"INSERT OR IGNORE INTO pengukuran (row_hash, {', '.join(_quote(c) for c in STORE_COLUMNS)}) "
+               f"VALUES ({placeholders})")
+        rows = zip(hashes.tolist(), *(frame[col].tolist() for col in STORE_COLUMNS))
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(sql, rows)
+            added = self._conn.total_changes - before
+            self._conn.execute("INSERT OR REPLACE INTO impor VALUES (?, ?, ?, ?, ?)",
+                               (file_hash, name, time.strftime('%Y-%m-%dT%H:%M:%S'), len(frame), added))
+        return added, len(frame) - added
+
+    def _where(self, bulan=None, kabupaten=None, alamat=None, parameters=None, jenis=None):
+        # Klausa WHERE + argumen; None berarti tanpa filter pada dimensi tersebut
+        clauses, args = [], []
+        if bulan is not None:
+            clauses.append('"Tanggal" >= ? AND "Tanggal" < ?')
+            args.extend(_month_range(bulan))
+        if jenis is not None:
+            clauses.append('"Jenis Pengukuran" = ?')
+            args.append(jenis)
+        if parameters is not None:
+            # parameters: list (jenis, parameter)
+            pairs = list(parameters)
+            if not pairs:
+                clauses.append("0")
+            else:
+                clauses.append("(" + " OR ".join(['("Jenis Pengukuran" = ? AND "Parameter" = ?)'] * len(pairs)) + ")")
+                for pair in pairs:
+                    args.extend(pair)
+        for column, values in [('Kabupaten/Kota', kabupaten), ('Alamat', alamat)]:
+            if values is not None:
+                values = list(values)
+                clauses.append(f"{_quote(column)} IN ({', '.join('?' * len(values))})" if values else "0")
+                args.extend(values)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", args
+
+    def _cached(self, key, compute):
+        # Hasil compute() untuk versi store saat ini; dihitung ulang hanya jika ada baris baru
+        version = self.version()
+        with self._lock:
+            hit = self._query_cache.get(key)
+            if hit is not None and hit[0] == version:
+                self._query_cache.move_to_end(key)
+                return hit[1]
+        value = compute()
+        with self._lock:
+            self._query_cache[key] = (version, value)
+            self._query_cache.move_to_end(key)
+            while len(self._query_cache) > QUERY_CACHE_ENTRIES:
+                self._query_cache.popitem(last=False)
+        return value
+
+    def phase_sums(self, operators, **filters):
+        # Jumlah dan banyaknya nilai terukur (> 0, lihat qoe.beforeafter.measured) per (Alamat, Jenis
+        # Pengukuran, Parameter, Keterangan, Operator), diagregasi di SQLite sehingga hanya hasil
+        # kecil yang dimuat; dipakai panel Before/After (qoe.beforeafter.means_from_sums)
+        where, args = self._where(**filters)
+        group = ['Alamat', 'Jenis Pengukuran', 'Parameter', 'Keterangan']
+        aggregates = []
+        for i, op in enumerate(operators):
+            aggregates.append(f"SUM(CASE WHEN {_quote(op)} > 0 THEN {_quote(op)} END) AS sum_{i}")
+            aggregates.append(f"COUNT(CASE WHEN {_quote(op)} > 0 THEN 1 END) AS count_{i}")
+        keys = ", ".join(_quote(col) for col in group)
+        sql = f"SELECT {keys}, {', '.join(aggregates)} FROM pengukuran{where} GROUP BY {keys}"
+        with self._lock:
+            wide = pd.read_sql_query(sql, self._conn, params=args)
+
+        frames = []
+        for i, op in enumerate(operators):
+            frame = wide[group].assign(Operator=op, sum=wide[f"sum_{i}"].fillna(0.0), count=wide[f"count_{i}"])
+            frames.append(frame[frame['count'] > 0])
+        sums = pd.concat(frames, ignore_index=True)
+        for col in group:
+            sums[col] = sums[col].astype('category')
+        sums['Operator'] = pd.Categorical(sums['Operator'], categories=list(operators))
+        return sums
+
+    def months(self):
+        # Label bulan ('%B %Y') yang tersedia, urut kronologis
+        def compute():
+            with self._lock:
+                rows = self._conn.execute(
+                    'SELECT DISTINCT substr("Tanggal", 1, 7) FROM pengukuran WHERE "Tanggal" IS NOT NULL ORDER BY 1').fetchall()
+            return [pd.to_datetime(row[0], format='%Y-%m').strftime('%B %Y') for row in rows]
+        return list(self._cached(('months',), compute))
+
+    def distinct(self, column, **filters):
+        # Nilai unik kolom untuk filter yang diberikan, urut kemunculan pertama
+        where, args = self._where(**filters)
+        sql = (f"SELECT {_quote(column)} FROM pengukuran{where} "
+               f"GROUP BY {_quote(column)} HAVING {_quote(column)} IS NOT NULL ORDER BY MIN(rowid)")
+
+        def compute():
+            with self._lock:
+                return [row[0] for row in self._conn.execute(sql, args).fetchall()]
+        return list(self._cached(('distinct', sql, tuple(args)), compute))
+
+    def query(self, **filters):
+        # Potongan data yang cocok sebagai frame bertipe (skema sama dengan hasil qoe.ingest)
+        where, args = self._where(**filters)
+        sql = f"SELECT {', '.join(_quote(c) for c in STORE_COLUMNS)} FROM pengukuran{where} ORDER BY rowid"
+        with self._lock:
+            df = pd.read_sql_query(sql, self._conn, params=args)
+        for col in TEXT_COLUMNS + ['Tanggal']:
+            df[col] = df[col].astype('category')
+        return ingest.type_frame(df)
+
+    def version(self):
+        # Berubah setiap ada baris baru (store tidak pernah menghapus baris); MAX(rowid) cukup
+        # membaca ujung B-tree, tidak memindai tabel. Dipakai sebagai kunci cache potongan dan query.
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM pengukuran").fetchone()[0]
+
+    def stats(self):
+        def compute():
+            with self._lock:
+                n_rows = self._conn.execute("SELECT COUNT(*) FROM pengukuran").fetchone()[0]
+                n_imports = self._conn.execute("SELECT COUNT(*) FROM impor").fetchone()[0]
+            return {'rows': n_rows, 'imports': n_imports}
+        return dict(self._cached(('stats',), compute))
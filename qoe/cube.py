@@ -0,0 +1,157 @@
+# Kubus agregat per (Bulan, Kabupaten/Kota, Jenis Pengukuran, Parameter, Operator):
+# min, max, mean, count beserta lokasi/tanggal nilai tertinggi dan terendah.
+# Dibangun sekali saat data dimuat, lalu ringkasan per parameter cukup dijawab
+# dengan lookup dan penggabungan beberapa sel kubus.
+import numpy as np
+import pandas as pd
+
+CUBE_DIMENSIONS = ['Bulan', 'Kabupaten/Kota', 'Jenis Pengukuran', 'Parameter']
+
+STAT_COLUMNS = ['min', 'max', 'sum', 'count',
+                'min_row', 'min_alamat', 'min_tanggal',
+                'max_row', 'max_alamat', 'max_tanggal']
+
+
+def _long_values(df, operators, row_offset=0):
+    # Susun nilai operator menjadi format panjang (satu baris per nilai non-null)
+    row_ids = df.index.to_numpy() + row_offset
+    frames = []
+    for op in operators:
+        if op not in df.columns:
+            continue
+        nilai = pd.to_numeric(df[op], errors='coerce')
+        mask = nilai.notna().to_numpy()
+        frames.append(pd.DataFrame({
+            'Operator': op,
+            'Nilai': nilai.to_numpy()[mask],
+            'row': row_ids[mask],
+            'pos': np.flatnonzero(mask),
+        }))
+    if not frames:
+        return pd.DataFrame(columns=['Operator', 'Nilai', 'row', 'pos'])
+    long = pd.concat(frames, ignore_index=True)
+    long['Operator'] = pd.Categorical(long['Operator'], categories=list(operators))
+    return long
+
+
+def build_cube(df, operators, dimensions=CUBE_DIMENSIONS, row_offset=0):
+    # Bangun kubus untuk df; row_offset dipakai saat baris baru ditambahkan bertahap
+    dims = [d for d in dimensions if d in df.columns]
+    long = _long_values(df, operators, row_offset)
+    for d in dims:
+        long[d] = df[d].array.take(long['pos'].to_numpy())
+
+    keys = dims + ['Operator']
+    if long.empty:
+        return pd.DataFrame(columns=keys + STAT_COLUMNS)
+
+    # Urutkan berdasarkan nomor baris agar nilai kembar memilih kemunculan pertama (seperti idxmax/idxmin)
+    long = long.sort_values('row', kind='stable')
+    # Jumlah diakumulasi dalam float64 agar rata-rata tetap presisi walau nilai float32
+    long['Nilai64'] = long['Nilai'].astype('float64')
+    grouped = long.groupby(keys, observed=True, sort=False, dropna=False)
+    cube = grouped['Nilai'].agg(['min', 'max'])
+    cube['sum'] = grouped['Nilai64'].sum()
+    cube['count'] = grouped['Nilai'].count()
+
+    idx_min = grouped['Nilai'].idxmin().to_numpy()
+    idx_max = grouped['Nilai'].idxmax().to_numpy()
+    pos_min = long.loc[idx_min, 'pos'].to_numpy()
+    pos_max = long.loc[idx_max, 'pos'].to_numpy()
+
+    cube['min_row'] = long.loc[idx_min, 'row'].to_numpy()
+    cube['min_alamat'] = np.asarray(df['Alamat'].array.take(pos_min))
+    cube['min_tanggal'] = np.asarray(df['Tanggal_str'].array.take(pos_min))
+    cube['max_row'] = long.loc[idx_max, 'row'].to_numpy()
+    cube['max_alamat'] = np.asarray(df['Alamat'].array.take(pos_max))
+    cube['max_tanggal'] = np.asarray(df['Tanggal_str'].array.take(pos_max))
+    return cube.reset_index()
+
+
+def _first_per_group(group, *sort_keys):
+    # Posisi baris pertama tiap grup (urut nomor grup) setelah diurutkan menurut sort_keys
+    order = np.lexsort(sort_keys[::-1] + (group,))
+    sorted_group = group[order]
+    return order[np.r_[True, sorted_group[1:] != sorted_group[:-1]]]
+
+
+def _combine(cells, keys):
+    # Gabungkan beberapa sel kubus menjadi satu sel per keys. Baris min/max dipilih per posisi
+    # dengan nomor grup (bukan join indeks) agar kunci NaN (mis. Kabupaten/Kota kosong) tetap cocok.
+    if cells.empty:
+        return pd.DataFrame(columns=keys + STAT_COLUMNS)
+
+    cells = cells.reset_index(drop=True)
+    group = cells.groupby(keys, observed=True, sort=False, dropna=False).ngroup().to_numpy()
+    n_groups = group.max() + 1
+
+    combined = cells.iloc[np.unique(group, return_index=True)[1]][keys].reset_index(drop=True)
+    combined['sum'] = np.bincount(group, weights=cells['sum'].to_numpy(dtype='float64'), minlength=n_groups)
+    combined['count'] = np.bincount(group, weights=cells['count'].to_numpy(dtype='float64'),
+                                    minlength=n_groups).astype('int64')
+    lowest = _first_per_group(group, cells['min'].to_numpy(), cells['min_row'].to_numpy())
+    highest = _first_per_group(group, -cells['max'].to_numpy(), cells['max_row'].to_numpy())
+    for col in ['min', 'min_row', 'min_alamat', 'min_tanggal']:
+        combined[col] = cells[col].to_numpy()[lowest]
+    for col in ['max', 'max_row', 'max_alamat', 'max_tanggal']:
+        combined[col] = cells[col].to_numpy()[highest]
+    return combined[keys + STAT_COLUMNS]
+
+
+def update_cube(cube, df_new, operators, row_offset, dimensions=CUBE_DIMENSIONS):
+    # Tambahkan baris baru ke kubus tanpa membangun ulang dari seluruh data
+    delta = build_cube(df_new, operators, dimensions, row_offset)
+    if cube is None or cube.empty:
+        return delta
+    keys = [c for c in cube.columns if c not in STAT_COLUMNS]
+    merged = _combine(pd.concat([cube, delta], ignore_index=True), keys)
+    if 'Operator' in merged.columns:
+        merged['Operator'] = pd.Categorical(merged['Operator'], categories=list(operators))
+    return merged
+
+
+def query(cube, operators, parameter, jenis_pengukuran, bulan=None, kabupaten=None):
+    # Ringkasan per operator untuk satu parameter; bulan/kabupaten None berarti semua
+    mask = (cube['Parameter'] == parameter) & (cube['Jenis Pengukuran'] == jenis_pengukuran)
+    if bulan is not None and 'Bulan' in cube.columns:
+        mask &= cube['Bulan'] == bulan
+    if kabupaten is not None and 'Kabupaten/Kota' in cube.columns:
+        mask &= cube['Kabupaten/Kota'].isin(kabupaten)
+    return operator_summary(cube[mask], operators)
+
+
+def summarize(df, operators):
+    # Ringkasan per operator langsung dari potongan data (dipakai jika kubus tidak bisa menjawab filter)
+    return operator_summary(build_cube(df, operators, dimensions=[]), operators)
+
+
+def operator_summary(cells, operators):
+    summary = _combine(cells, ['Operator'])
+    summary['mean'] = summary['sum'] / summary['count']
+    order = {op: i for i, op in enumerate(operators)}
+    summary = summary.assign(_order=summary['Operator'].astype(str).map(order))
+    return summary.sort_values('_order').drop(columns='_order').reset_index(drop=True)
+
+
+def extremes(summary):
+    # Nilai tertinggi dan terendah lintas operator (urutan operator sebagai pemecah nilai kembar)
+    if summary is None or summary.empty:
+        return None, None
+    return summary.loc[summary['max'].idxmax()], summary.loc[summary['min'].idxmin()]
+
+
+def comparison_table(summary, parameter, test_type):
+    # Tabel perbandingan lokasi tertinggi/terendah per operator
+    if summary is None or summary.empty:
+        return None
+    return pd.DataFrame({
+        'Operator': summary['Operator'].astype(str),
+        'Parameter': parameter,
+        'Jenis Test': test_type,
+        'Nilai Tertinggi': summary['max'],
+        'Lokasi Tertinggi': summary['max_alamat'],
+        'Tanggal Tertinggi': summary['max_tanggal'],
+        'Nilai Terendah': summary['min'],
+        'Lokasi Terendah': summary['min_alamat'],
+        'Tanggal Terendah': summary['min_tanggal'],
+    })
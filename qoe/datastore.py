@@ -0,0 +1,177 @@
+# Penyimpanan dataset bersama per proses: satu frame bertipe per hash isi file dibagi oleh
+# semua sesi (tanpa salinan pickle per sesi seperti st.cache_data). Struktur turunan
+# (kubus, tabel panjang, indeks filter) disimpan pada entri yang sama. Entri dihitung
+# referensinya per sesi dan dikeluarkan secara LRU saat total ukuran melewati anggaran byte;
+# entri yang masih dipakai sesi aktif tidak dikeluarkan.
+#
+# Setiap pemanggil menerima salinan dangkal frame yang disimpan: kolom tetap berbagi data,
+# tetapi penugasan kolom di satu sesi hanya mengubah objek milik sesi tersebut. Dengan
+# Copy-on-Write pandas (bawaan sejak pandas 3, lihat requirements.txt) perubahan nilai di
+# tempat pada salinan juga tidak menembus ke data bersama.
+import os
+import sys
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MAX_BYTES = int(os.environ.get("QOE_DATASET_STORE_MB", "2048")) * 2 ** 20
+
+
+def estimate_bytes(obj, _seen=None):
+    # Perkiraan ukuran resident (frame, array, dan objek berisi keduanya seperti FilterIndex)
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, dict):
+        return sum(estimate_bytes(v, _seen) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(estimate_bytes(v, _seen) for v in obj)
+    if hasattr(obj, '__dict__'):
+        return estimate_bytes(vars(obj), _seen)
+    return sys.getsizeof(obj)
+
+
+class _Entry:
+    def __init__(self, frame):
+        self.frame = frame
+        self.derived = {}
+        self.nbytes = estimate_bytes(frame)
+        self.refs = set()
+
+
+class DatasetStore:
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._sessions = {}
+        # Lock pemuatan per kunci: [lock, jumlah thread pemakai], dihapus saat tidak dipakai lagi
+        self._loading = {}
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @contextmanager
+    def _key_lock(self, key):
+        with self._lock:
+            slot = self._loading.setdefault(key, [threading.Lock(), 0])
+            slot[1] += 1
+        try:
+            with slot[0]:
+                yield
+        finally:
+            with self._lock:
+                slot[1] -= 1
+                if slot[1] == 0:
+                    del self._loading[key]
+
+    def get_or_load(self, file_hash, load, session_id=None):
+        # Frame untuk file_hash; load() hanya dipanggil sekali per hash walau diminta banyak sesi
+        # bersamaan. Jika session_id diberikan, entri langsung direferensikan oleh sesi tersebut.
+        with self._key_lock(file_hash):
+            with self._lock:
+                entry = self._entries.get(file_hash)
+                if entry is not None:
+                    self._entries.move_to_end(file_hash)
+                    self.hits += 1
+            if entry is None:
+                # Dimuat di luar lock utama agar sesi dengan dataset lain tidak ikut menunggu
+                entry = _Entry(load())
+                with self._lock:
+                    self.misses += 1
+                    self._entries[file_hash] = entry
+                    self._bytes += entry.nbytes
+            with self._lock:
+                if session_id is not None:
+                    self.acquire(session_id, file_hash)
+                self._evict()
+            return entry.frame.copy(deep=False)
+
+    def derived(self, file_hash, name, build):
+        # Struktur turunan dari frame (dibangun sekali, ikut dikeluarkan bersama frame-nya)
+        with self._key_lock((file_hash, name)):
+            with self._lock:
+                entry = self._entries.get(file_hash)
+                if entry is not None and name in entry.derived:
+                    return entry.derived[name]
+            value = build()
+            if entry is None:
+                return value
+            size = estimate_bytes(value)
+            with self._lock:
+                entry.derived[name] = value
+                if self._entries.get(file_hash) is entry:
+                    entry.nbytes += size
+                    self._bytes += size
+                    self._evict()
+            return value
+
+    def acquire(self, session_id, file_hash):
+        # Tandai file_hash dipakai oleh sesi; referensi sesi ke dataset sebelumnya dilepas
+        with self._lock:
+            previous = self._sessions.get(session_id)
+            if previous == file_hash:
+                return
+            self._release(session_id)
+            entry = self._entries.get(file_hash)
+            if entry is not None:
+                entry.refs.add(session_id)
+                self._sessions[session_id] = file_hash
+            self._evict()
+
+    def _release(self, session_id):
+        file_hash = self._sessions.pop(session_id, None)
+        entry = self._entries.get(file_hash)
+        if entry is not None:
+            entry.refs.discard(session_id)
+
+    def release(self, session_id):
+        with self._lock:
+            self._release(session_id)
+            self._evict()
+
+    def prune(self, is_alive):
+        # Lepas referensi milik sesi yang sudah berakhir
+        with self._lock:
+            for session_id in [s for s in self._sessions if not is_alive(s)]:
+                self._release(session_id)
+            self._evict()
+
+    def _evict(self):
+        # LRU di antara entri tanpa referensi sesi sampai total ukuran kembali di bawah anggaran
+        for file_hash in list(self._entries):
+            if self._bytes <= self.max_bytes:
+                break
+            entry = self._entries[file_hash]
+            if entry.refs:
+                continue
+            del self._entries[file_hash]
+            self._bytes -= entry.nbytes
+            self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'datasets': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'sessions': len(self._sessions),
+                'pinned': sum(1 for entry in self._entries.values() if entry.refs),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'evictions': self.evictions,
+            }
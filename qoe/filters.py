@@ -0,0 +1,90 @@
+# Mesin filter berindeks untuk kaskade Bulan / Kabupaten / Alamat / Jenis Pengukuran / Parameter.
+# Untuk setiap dimensi disimpan posting list: kode kategori -> posisi baris terurut.
+# Filter menghasilkan array posisi baris (None = semua baris) sehingga tidak ada
+# pemindaian boolean atau df.copy() penuh di setiap rerun.
+import numpy as np
+import pandas as pd
+
+FILTER_DIMENSIONS = ['Bulan', 'Kabupaten/Kota', 'Alamat', 'Jenis Pengukuran', 'Parameter']
+
+
+def intersect(rows_a, rows_b):
+    # Irisan dua array posisi terurut (None berarti semua baris)
+    if rows_a is None:
+        return rows_b
+    if rows_b is None:
+        return rows_a
+    if len(rows_a) > len(rows_b):
+        rows_a, rows_b = rows_b, rows_a
+    if len(rows_a) == 0 or len(rows_b) == 0:
+        return rows_a[:0]
+    idx = np.searchsorted(rows_b, rows_a)
+    idx[idx == len(rows_b)] = 0
+    return rows_a[rows_b[idx] == rows_a]
+
+
+class FilterIndex:
+    def __init__(self, df, dimensions=FILTER_DIMENSIONS):
+        self.n_rows = len(df)
+        self.codes = {}
+        self.categories = {}
+        self.order = {}
+        self.offsets = {}
+        self.n_missing = {}
+
+        for dim in dimensions:
+            if dim not in df.columns:
+                continue
+            col = df[dim]
+            if not isinstance(col.dtype, pd.CategoricalDtype):
+                col = col.astype('category')
+            codes = col.cat.codes.to_numpy()
+            n_cats = len(col.cat.categories)
+
+            # Urutkan posisi baris per kode (stable -> posisi dalam tiap kode tetap terurut)
+            order = np.argsort(codes, kind='stable')
+            counts = np.bincount(codes[codes >= 0], minlength=n_cats)
+            n_missing = int((codes < 0).sum())
+
+            self.codes[dim] = codes
+            self.categories[dim] = col.cat.categories
+            self.order[dim] = order[n_missing:]
+            self.offsets[dim] = np.concatenate([[0], np.cumsum(counts)])
+            self.n_missing[dim] = n_missing
+
+    def __contains__(self, dim):
+        return dim in self.codes
+
+    def _positions(self, dim, code):
+        start, end = self.offsets[dim][code], self.offsets[dim][code + 1]
+        return self.order[dim][start:end]
+
+    def rows_for(self, dim, values):
+        # Posisi baris terurut untuk baris dengan dim bernilai salah satu dari values
+        categories = self.categories[dim]
+        codes = categories.get_indexer(list(values))
+        codes = np.unique(codes[codes >= 0])
+        if len(codes) == 0:
+            return np.empty(0, dtype='int64')
+        if len(codes) == 1:
+            return self._positions(dim, codes[0])
+        return np.sort(np.concatenate([self._positions(dim, c) for c in codes]))
+
+    def unique(self, dim, rows=None):
+        # Nilai unik dim di antara rows, urut kemunculan pertama (seperti Series.unique())
+        codes = self.codes[dim] if rows is None else self.codes[dim][rows]
+        codes = pd.unique(codes)
+        codes = codes[codes >= 0]
+        return self.categories[dim].take(codes).tolist()
+
+    def filter(self, rows, dim, values):
+        # Batasi rows ke baris dengan dim dalam values; jika values mencakup semua
+        # nilai yang ada di rows, cukup baris dengan dim kosong yang dibuang (seperti isin)
+        values = set(values)
+        if values.issuperset(self.unique(dim, rows)):
+            if self.n_missing[dim] == 0:
+                return rows
+            if rows is None:
+                return np.flatnonzero(self.codes[dim] >= 0)
+            return rows[self.codes[dim][rows] >= 0]
+        return intersect(rows, self.rows_for(dim, values))
@@ -0,0 +1,101 @@
+# Ingest file CSV QoE: parsing bertipe sekali per file lalu disimpan sebagai
+# snapshot kolumnar (Parquet) yang dikunci dengan hash isi file.
+import hashlib
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+# Versi skema snapshot - naikkan jika aturan parsing berubah agar snapshot lama tidak dipakai
+SCHEMA_VERSION = 1
+
+# Lokasi penyimpanan snapshot (bisa diganti lewat environment variable)
+CACHE_DIR = os.environ.get("QOE_CACHE_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".qoe_cache"))
+
+OPERATOR_COLUMNS = ['Telkomsel', 'IOH', 'XL Axiata']
+
+# Kolom teks berulang disimpan sebagai categorical
+CATEGORY_COLUMNS = ['Bulan', 'Hari', 'Tanggal', 'Jenis Pengukuran', 'Test', 'Parameter',
+                    'Kabupaten/Kota', 'Alamat', 'Keterangan']
+
+# Skema eksplisit untuk pd.read_csv
+CSV_DTYPES = {col: 'category' for col in CATEGORY_COLUMNS}
+CSV_DTYPES.update({'Longitude': 'float64', 'Latitude': 'float64'})
+
+
+def content_hash(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _categorical_from_codes(codes, values):
+    # Bentuk categorical baru dari nilai per kategori lama (kode -1 tetap NaN)
+    inverse, uniques = pd.factorize(values)
+    # Kode -1 diarahkan ke slot tambahan bernilai -1 (aman juga jika tidak ada kategori)
+    return pd.Categorical.from_codes(np.append(inverse, -1)[codes], categories=uniques)
+
+
+def derive_dates(df):
+    # Parse tanggal dan turunkan kolom Bulan / Tanggal_str hanya pada nilai unik, bukan per baris
+    if 'Tanggal' not in df.columns:
+        return df
+
+    tanggal = df['Tanggal']
+    if not isinstance(tanggal.dtype, pd.CategoricalDtype):
+        tanggal = tanggal.astype('category')
+
+    kategori_tanggal = pd.to_datetime(tanggal.cat.categories)
+    codes = tanggal.cat.codes.to_numpy()
+
+    # Kode -1 (Tanggal kosong) diarahkan ke slot NaT tambahan, juga saat semua Tanggal kosong
+    parsed = np.append(kategori_tanggal.to_numpy(), np.datetime64('NaT'))[codes]
+
+    df['Tanggal'] = parsed
+    df['Bulan'] = _categorical_from_codes(codes, kategori_tanggal.strftime('%B %Y'))
+    df['Tanggal_str'] = _categorical_from_codes(codes, kategori_tanggal.strftime('%d-%m-%Y'))  # Format tanggal untuk tooltip
+    return df
+
+
+def type_frame(df):
+    # Terapkan tipe akhir pada frame hasil pd.read_csv(..., dtype=CSV_DTYPES)
+    for op in OPERATOR_COLUMNS:
+        if op in df.columns:
+            df[op] = pd.to_numeric(df[op], errors='coerce').astype('float32')
+
+    return derive_dates(df)
+
+
+def parse_csv(source):
+    # Baca CSV dengan skema eksplisit: categorical untuk dimensi, float32 untuk nilai operator
+    return type_frame(pd.read_csv(source, dtype=CSV_DTYPES))
+
+
+def snapshot_path(file_hash):
+    return os.path.join(CACHE_DIR, f"{file_hash}-v{SCHEMA_VERSION}.parquet")
+
+
+def load_snapshot(data, file_hash=None):
+    # Muat snapshot jika sudah ada; jika belum, parse CSV lalu simpan snapshot-nya
+    if file_hash is None:
+        file_hash = content_hash(data)
+    path = snapshot_path(file_hash)
+
+    if os.path.exists(path):
+        try:
+            return pd.read_parquet(path)
+        except Exception:
+            # Snapshot rusak (mis. penulisan terputus) - parse ulang dari CSV
+            pass
+
+    df = parse_csv(io.BytesIO(data))
+
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    except OSError:
+        # Direktori cache tidak bisa ditulis - tetap kembalikan hasil parsing
+        pass
+
+    return df
@@ -0,0 +1,47 @@
+# Tabel kanonik format panjang (row, Operator, Nilai) yang dibangun sekali saat data
+# dimuat, ditambah tabel dimensi bersama (lokasi, tanggal, parameter, dst).
+# Baris operator ke-i untuk baris data r berada di posisi i * n + r, sehingga
+# potongan hasil filter cukup diambil dengan aritmetika indeks tanpa melt.
+import numpy as np
+import pandas as pd
+
+
+def build_long(df, operators):
+    ops = [op for op in operators if op in df.columns]
+    n = len(df)
+
+    long = pd.DataFrame({
+        'row': np.tile(np.arange(n, dtype='int64'), len(ops)),
+        'Operator': pd.Categorical.from_codes(np.repeat(np.arange(len(ops), dtype='int8'), n), categories=ops),
+        'Nilai': np.concatenate([df[op].to_numpy(dtype='float32', na_value=np.nan) for op in ops]) if ops else np.empty(0, dtype='float32'),
+    })
+    dims = df.drop(columns=ops).reset_index(drop=True)
+    return long, dims
+
+
+def long_positions(long, dims, rows):
+    # Posisi baris di tabel panjang untuk baris data rows (urutan: operator lalu baris, seperti melt)
+    rows = np.asarray(rows, dtype='int64')
+    n_ops = len(long['Operator'].cat.categories)
+    return (np.arange(n_ops, dtype='int64')[:, None] * len(dims) + rows[None, :]).ravel()
+
+
+def row_mask(long, dims, rows):
+    # Mask boolean per baris tabel panjang: True jika baris datanya termasuk rows (None = semua baris)
+    if rows is None:
+        return np.ones(len(long), dtype=bool)
+    selected = np.zeros(len(dims), dtype=bool)
+    selected[np.asarray(rows, dtype='int64')] = True
+    return selected[long['row'].to_numpy()]
+
+
+def long_view(long, dims, rows, columns=()):
+    # Potongan tabel panjang untuk baris data rows, dengan atribut dimensi yang diminta
+    rows = np.asarray(rows, dtype='int64')
+    view = long.take(long_positions(long, dims, rows)).reset_index(drop=True)
+    if columns:
+        dim_rows = np.tile(rows, len(long['Operator'].cat.categories))
+        for col in columns:
+            if col in dims.columns:
+                view[col] = dims[col].array.take(dim_rows)
+    return view
@@ -0,0 +1,321 @@
+# Layer marker vektor untuk peta QoE: seluruh titik dikirim sebagai satu payload
+# kolumnar (array per kolom + kamus kategori), lalu marker, ikon dan popup
+# dibangun di browser. Biaya di Python sebanding dengan jumlah operasi kolom,
+# bukan jumlah baris. Layer grid merender agregat per sel sesuai zoom dan viewport;
+# layer lintasan menggambar Route Test sebagai polyline yang disederhanakan per zoom.
+import numpy as np
+import pandas as pd
+from folium.map import Layer
+from folium.plugins import MarkerCluster
+from folium.template import Template
+
+from qoe import spatialgrid
+
+
+# Kolom dimensi yang dibutuhkan payload (diambil dari tabel dimensi bersama)
+MAP_COLUMNS = ['Latitude', 'Longitude', 'Alamat', 'Tanggal_str', 'Kabupaten/Kota']
+
+
+def _encode(series):
+    # Kode integer + daftar nilai unik (setara dengan categorical) untuk kolom teks
+    codes, uniques = pd.factorize(series)
+    return codes.tolist(), [str(u) for u in uniques]
+
+
+def marker_payload(layers, color_map, grid=False):
+    # layers: list berisi (jenis_test, parameter, view) dengan view = potongan tabel panjang
+    # (Operator, Nilai + MAP_COLUMNS) yang sudah difilter per parameter; grid=True menambahkan
+    # piramida grid (qoe.spatialgrid) untuk GridMarkerLayer
+    parts = []
+    for test_idx, (_, _, view) in enumerate(layers):
+        if view is None or view.empty:
+            continue
+        view = view[view['Nilai'].notna().to_numpy()]
+        if not view.empty:
+            parts.append((test_idx, view))
+
+    if not parts:
+        return None
+
+    frame = pd.concat([view for _, view in parts], ignore_index=True)
+    operators = [str(op) for op in frame['Operator'].cat.categories]
+
+    alamat_codes, alamat_cat = _encode(frame['Alamat'])
+    tanggal_codes, tanggal_cat = _encode(frame['Tanggal_str'])
+    if 'Kabupaten/Kota' in frame.columns:
+        kab_codes, kab_cat = _encode(frame['Kabupaten/Kota'])
+    else:
+        kab_codes, kab_cat = None, []
+
+    lat = frame['Latitude'].to_numpy(dtype='float64')
+    lon = frame['Longitude'].to_numpy(dtype='float64')
+    nilai = np.round(frame['Nilai'].to_numpy(dtype='float64'), 2)
+    op = frame['Operator'].cat.codes.to_numpy()
+    test = np.concatenate([np.full(len(view), test_idx, dtype='int8') for test_idx, view in parts])
+
+    payload = {
+        'lat': lat.tolist(),
+        'lon': lon.tolist(),
+        'nilai': nilai.tolist(),
+        'op': op.tolist(),
+        'test': test.tolist(),
+        'alamat': alamat_codes,
+        'tanggal': tanggal_codes,
+        'kab': kab_codes,
+        'ops': operators,
+        'colors': [color_map.get(op, 'gray') for op in operators],
+        'tests': [jenis_test for jenis_test, _, _ in layers],
+        'params': [str(parameter) for _, parameter, _ in layers],
+        'alamat_cat': alamat_cat,
+        'tanggal_cat': tanggal_cat,
+        'kab_cat': kab_cat,
+    }
+    if grid:
+        # Piramida grid per level zoom dari kolom yang sama (nilai sebelum pembulatan)
+        payload['grid'] = spatialgrid.build_grid(lat, lon, frame['Nilai'].to_numpy(dtype='float64'), op, test, len(operators))
+    return payload
+
+
+# Fungsi JavaScript bersama: escape HTML untuk popup/tooltip
+_ESCAPE_JS = """
+                function esc(s) {
+                    return String(s).replace(/[&<>"']/g, function(c) {
+                        return {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'}[c];
+                    });
+                }
+"""
+
+# Fungsi JavaScript bersama: satu marker titik (ikon, popup, tooltip) dari indeks payload
+_POINT_MARKER_JS = """
+                function pointMarker(data, i) {
+                    var op = data.ops[data.op[i]];
+                    var color = data.colors[data.op[i]];
+                    var jenis = data.tests[data.test[i]];
+                    var alamat = data.alamat[i] >= 0 ? data.alamat_cat[data.alamat[i]] : '';
+                    var tanggal = data.tanggal[i] >= 0 ? data.tanggal_cat[data.tanggal[i]] : '';
+                    var route = jenis === 'Route Test';
+
+                    var iconHtml = route
+                        ? '<div class="marker-pulse" style="animation-delay: ' + ((data.op[i] % 5) * 0.2) + 's;">' +
+                          '<i class="fa fa-map-marker fa-2x" style="color:' + color + ';"></i></div>'
+                        : '<div class="marker-pulse-fast" style="animation-delay: ' + ((data.op[i] % 3) * 0.3) + 's;">' +
+                          '<i class="fa fa-wifi fa-2x" style="color:' + color + ';"></i></div>';
+
+                    var popup = '<div style="font-family: Arial; font-size: 12px;">' +
+                        '<b>Jenis Pengukuran:</b> ' + esc(jenis) + '<br>' +
+                        '<b>Lokasi:</b> ' + esc(alamat) + '<br>' +
+                        '<b>Operator:</b> ' + esc(op) + '<br>' +
+                        '<b>Parameter:</b> ' + esc(data.params[data.test[i]]) + '<br>' +
+                        '<b>Nilai:</b> ' + data.nilai[i].toFixed(2) + '<br>' +
+                        '<b>Tanggal:</b> ' + esc(tanggal) + '<br>' +
+                        (data.kab && data.kab[i] >= 0 ? '<b>Kabupaten/Kota:</b> ' + esc(data.kab_cat[data.kab[i]]) + '<br>' : '') +
+                        '</div>';
+
+                    return L.marker([data.lat[i], data.lon[i]], {
+                        icon: L.divIcon({
+                            html: iconHtml,
+                            iconSize: [30, 30],
+                            iconAnchor: route ? [15, 30] : [15, 15],
+                            className: 'empty'
+                        })
+                    })
+                        .bindPopup(popup, {maxWidth: 300})
+                        .bindTooltip(esc(jenis + ': ' + op + ' - ' + alamat));
+                }
+"""
+
+
+class ColumnarMarkerCluster(MarkerCluster):
+    # MarkerCluster yang marker-nya dibuat oleh JavaScript dari payload kolumnar
+    _template = Template(
+        """
+        {% macro script(this, kwargs) %}
+            var {{ this.get_name() }} = (function(){
+                var data = {{ this.data|tojson }};
+                var cluster = L.markerClusterGroup({{ this.options|tojavascript }});
+""" + _ESCAPE_JS + _POINT_MARKER_JS + """
+                for (var i = 0; i < data.lat.length; i++) {
+                    pointMarker(data, i).addTo(cluster);
+                }
+
+                cluster.addTo({{ this._parent.get_name() }});
+                return cluster;
+            })();
+        {% endmacro %}"""
+    )
+
+    def __init__(self, data, **kwargs):
+        super().__init__(**kwargs)
+        self._name = "ColumnarMarkerCluster"
+        self.data = data
+
+
+class GridMarkerLayer(Layer):
+    # Layer peta berbasis grid multi-resolusi (payload dengan grid=True): pada setiap perpindahan
+    # peta hanya sel level zoom aktif yang berada di viewport yang dirender; mulai point_zoom
+    # titik individual di dalam viewport ditampilkan sebagai pengganti sel
+    _template = Template(
+        """
+        {% macro script(this, kwargs) %}
+            var {{ this.get_name() }} = (function(){
+                var data = {{ this.data|tojson }};
+                var grid = data.grid;
+                var map = {{ this._parent.get_name() }};
+                var layer = L.layerGroup();
+""" + _ESCAPE_JS + _POINT_MARKER_JS + """
+                function fmt(v) {
+                    return v === null ? '-' : v.toFixed(2);
+                }
+
+                function cellMarker(level, j) {
+                    var jenis = data.tests[level.test[j]];
+                    var route = jenis === 'Route Test';
+                    var rows = '', table = '';
+                    for (var k = 0; k < data.ops.length; k++) {
+                        if (!level.op_count[j][k]) continue;
+                        rows += '<div style="white-space: nowrap;"><span style="color:' + data.colors[k] + ';">&#9679;</span> ' +
+                            fmt(level.op_mean[j][k]) + '</div>';
+                        table += '<tr><td>' + esc(data.ops[k]) + '</td><td>' + level.op_count[j][k] + '</td><td>' +
+                            fmt(level.op_mean[j][k]) + '</td><td>' + fmt(level.op_min[j][k]) + '</td><td>' +
+                            fmt(level.op_max[j][k]) + '</td></tr>';
+                    }
+                    var iconHtml = '<div style="transform: translate(-50%, -50%); background: white; opacity: 0.9; ' +
+                        'border: 2px solid gray; border-radius: ' + (route ? '4px' : '12px') + '; padding: 2px 5px; ' +
+                        'font: 11px Arial; text-align: left;">' +
+                        '<i class="fa ' + (route ? 'fa-map-marker' : 'fa-wifi') + '"></i> ' + level.count[j] + rows + '</div>';
+                    var popup = '<div style="font-family: Arial; font-size: 12px;">' +
+                        '<b>Jenis Pengukuran:</b> ' + esc(jenis) + '<br>' +
+                        '<b>Parameter:</b> ' + esc(data.params[level.test[j]]) + '<br>' +
+                        '<b>Jumlah titik:</b> ' + level.count[j] + '<br>' +
+                        '<table style="margin-top: 4px;"><tr><th>Operator</th><th>n</th><th>Rata-rata</th><th>Min</th><th>Maks</th></tr>' +
+                        table + '</table></div>';
+                    return L.marker([level.lat[j], level.lon[j]], {
+                        icon: L.divIcon({html: iconHtml, iconSize: null, className: 'empty'})
+                    })
+                        .bindPopup(popup, {maxWidth: 400})
+                        .bindTooltip(esc(jenis + ': ' + level.count[j] + ' titik'));
+                }
+
+                function cellXY(lat, lon, n) {
+                    lat = Math.max(-85.05112878, Math.min(85.05112878, lat));
+                    var rad = lat * Math.PI / 180;
+                    return [
+                        Math.floor((lon + 180) / 360 * n),
+                        Math.floor((1 - Math.log(Math.tan(rad) + 1 / Math.cos(rad)) / Math.PI) / 2 * n)
+                    ];
+                }
+
+                function refresh() {
+                    layer.clearLayers();
+                    var zoom = map.getZoom();
+                    var bounds = map.getBounds().pad(0.25);
+                    if (zoom >= grid.point_zoom || !grid.levels.length) {
+                        for (var i = 0; i < data.lat.length; i++) {
+                            if (bounds.contains([data.lat[i], data.lon[i]])) layer.addLayer(pointMarker(data, i));
+                        }
+                        return;
+                    }
+                    var level = grid.levels[Math.max(0, Math.min(grid.levels.length - 1, zoom - grid.min_zoom))];
+                    var n = Math.pow(2, level.zoom + grid.subdivision);
+                    var nw = cellXY(bounds.getNorth(), bounds.getWest(), n);
+                    var se = cellXY(bounds.getSouth(), bounds.getEast(), n);
+                    for (var j = 0; j < level.x.length; j++) {
+                        if (level.x[j] >= nw[0] && level.x[j] <= se[0] && level.y[j] >= nw[1] && level.y[j] <= se[1]) {
+                            layer.addLayer(cellMarker(level, j));
+                        }
+                    }
+                }
+
+                layer.on('add', function() { map.on('moveend', refresh); refresh(); });
+                layer.on('remove', function() { map.off('moveend', refresh); layer.clearLayers(); });
+                {%- if this.show %}
+                layer.addTo(map);
+                {%- endif %}
+                return layer;
+            })();
+        {% endmacro %}"""
+    )
+
+    def __init__(self, data, name="Grid QoE", **kwargs):
+        super().__init__(name=name, **kwargs)
+        self._name = "GridMarkerLayer"
+        self.data = data
+
+
+class TrackLayer(Layer):
+    # Lintasan Route Test satu operator (payload dari qoe.trajectory.build_tracks): pada setiap
+    # perubahan zoom hanya titik dengan kepentingan di atas toleransi piksel yang dipakai, dan
+    # segmen berurutan dengan kelas warna sama digabung menjadi satu polyline
+    _template = Template(
+        """
+        {% macro script(this, kwargs) %}
+            var {{ this.get_name() }} = (function(){
+                var data = {{ this.data|tojson }};
+                var map = {{ this._parent.get_name() }};
+                var layer = L.layerGroup();
+""" + _ESCAPE_JS + """
+                function colorFor(v) {
+                    var c = 0;
+                    while (c < data.breaks.length && v > data.breaks[c]) c++;
+                    return data.palette[c];
+                }
+
+                function label(t, v) {
+                    return esc(data.operator + ' - ' + data.track_label[t] + ': ' + data.param + ' ' + v.toFixed(2));
+                }
+
+                function flush(run, color, t, sum, n) {
+                    L.polyline(run, {color: color, weight: 5, opacity: 0.9})
+                        .bindTooltip(label(t, sum / n))
+                        .addTo(layer);
+                }
+
+                function draw() {
+                    layer.clearLayers();
+                    var scale = 256 * Math.pow(2, map.getZoom());
+                    for (var t = 0; t + 1 < data.track_start.length; t++) {
+                        var s = data.track_start[t], e = data.track_start[t + 1];
+                        if (e - s === 1) {
+                            // Lintasan satu sampel digambar sebagai titik
+                            var v = data.cs[s] / data.k[s];
+                            L.circleMarker([data.lat[s], data.lon[s]], {
+                                radius: 6, color: '#333', weight: 1, fillColor: colorFor(v), fillOpacity: 0.9
+                            }).bindTooltip(label(t, v)).addTo(layer);
+                            continue;
+                        }
+                        var prev = s, run = [[data.lat[s], data.lon[s]]], runColor = null, sum = 0, n = 0;
+                        for (var i = s + 1; i < e; i++) {
+                            if (data.imp[i] * scale < data.tolerance_px) continue;
+                            // Rata-rata sampel (prev, i], termasuk sampel yang dibuang penyederhanaan
+                            var segSum = data.cs[i] - data.cs[prev], segN = data.k[i] - data.k[prev];
+                            var color = colorFor(segSum / segN);
+                            if (runColor !== null && color !== runColor) {
+                                flush(run, runColor, t, sum, n);
+                                run = [run[run.length - 1]];
+                                sum = 0;
+                                n = 0;
+                            }
+                            run.push([data.lat[i], data.lon[i]]);
+                            runColor = color;
+                            sum += segSum;
+                            n += segN;
+                            prev = i;
+                        }
+                        flush(run, runColor, t, sum, n);
+                    }
+                }
+
+                layer.on('add', function() { map.on('zoomend', draw); draw(); });
+                layer.on('remove', function() { map.off('zoomend', draw); layer.clearLayers(); });
+                {%- if this.show %}
+                layer.addTo(map);
+                {%- endif %}
+                return layer;
+            })();
+        {% endmacro %}"""
+    )
+
+    def __init__(self, data, name=None, **kwargs):
+        super().__init__(name=name or f"Lintasan {data['operator']}", **kwargs)
+        self._name = "TrackLayer"
+        self.data = data
@@ -0,0 +1,301 @@
+# Pembuat panel (grafik batang dan peta gabungan) yang tidak bergantung pada Streamlit,
+# dipakai oleh dashboard (bts4.py) maupun generator laporan batch (qoe.report).
+# Library grafik dan peta (plotly.express, folium, leafmap) berat untuk diimpor, sehingga
+# baru diimpor saat panel pertama kali dibuat, bukan saat modul ini dimuat.
+import pandas as pd
+
+from qoe import ingest, longtable
+
+OPERATORS = list(ingest.OPERATOR_COLUMNS)
+
+# Definisi Warna Operator
+COLOR_MAP = {
+    'Telkomsel': 'red',
+    'XL Axiata': 'blue',
+    'IOH': 'yellow'
+}
+
+# Mode marker peta: "grid" merender agregat per sel sesuai zoom dan viewport (titik individual
+# hanya pada zoom dekat), "cepat" membangun semua marker di browser dari payload kolumnar,
+# "klasik" membuat folium.Marker per baris
+MARKER_MODE_GRID = "Grid (agregat per zoom)"
+MARKER_MODE_FAST = "Cepat (render di browser)"
+MARKER_MODE_CLASSIC = "Klasik (per titik)"
+MARKER_MODES = [MARKER_MODE_GRID, MARKER_MODE_FAST, MARKER_MODE_CLASSIC]
+
+
+def preload_libraries():
+    # Impor library grafik dan peta di muka (mis. di thread latar saat server mulai)
+    import folium  # noqa: F401
+    import leafmap.foliumap  # noqa: F401
+    import plotly.express  # noqa: F401
+    from qoe import markers  # noqa: F401
+
+
+# Grafik batang nilai per lokasi dan operator untuk satu parameter (None jika tidak ada data)
+def create_bar_figure(data_long, data_dims, rows, parameter, title, operators=OPERATORS, color_map=COLOR_MAP):
+    import plotly.express as px
+
+    # Ambil potongan tabel panjang untuk baris parameter ini (tanpa melt)
+    df_plot = longtable.long_view(data_long, data_dims, rows, ['Alamat', 'Tanggal_str'])
+    if df_plot.empty:
+        return None
+
+    # Map warna ke operator
+    color_discrete_map = {op: color_map[op] for op in operators if op in color_map}
+
+    fig = px.bar(df_plot, x='Alamat', y='Nilai', color='Operator', barmode='group',
+                 title=f"{parameter} ({title})",
+                 hover_data=['Operator', 'Alamat', 'Tanggal_str', 'Nilai'],
+                 color_discrete_map=color_discrete_map)
+
+    # Menyesuaikan tata letak plot
+    fig.update_layout(
+        xaxis_title="Lokasi",
+        yaxis_title=parameter,
+        legend_title="Operator"
+    )
+    return fig
+
+
+# Fungsi untuk membuat peta gabungan dengan kedua jenis pengukuran dan animasi kedip.
+# rows_route/rows_static: posisi baris df untuk parameter terpilih; None dikembalikan jika tidak ada data.
+# route_tracks=True menggambar Route Test sebagai lintasan per operator (qoe.trajectory), bukan marker titik
+def create_combined_map(df, data_long, data_dims, rows_route, rows_static, param_route, param_static,
+                        marker_mode=MARKER_MODE_GRID, operators=OPERATORS, color_map=COLOR_MAP, route_tracks=True):
+    import folium
+    import leafmap.foliumap as leafmap
+    from folium.plugins import MarkerCluster
+
+    from qoe import markers, trajectory
+
+    # Cek apakah ada data untuk ditampilkan
+    has_route_data = len(rows_route) > 0
+    has_static_data = len(rows_static) > 0
+
+    if not has_route_data and not has_static_data:
+        return None
+
+    # Filter data berdasarkan parameter yang dipilih
+    df_route_map = df.take(rows_route) if has_route_data else pd.DataFrame()
+    df_static_map = df.take(rows_static) if has_static_data else pd.DataFrame()
+
+    # Gabungkan data untuk menentukan titik tengah peta
+    df_combined = pd.concat([df_route_map, df_static_map])
+
+    if df_combined.empty:
+        return None
+
+    # Menghitung nilai tengah koordinat untuk titik awal peta
+    center_lat = df_combined['Latitude'].mean()
+    center_lon = df_combined['Longitude'].mean()
+
+    # Buat peta dengan leafmap - set zoom awal lebih jauh (nilai zoom lebih kecil)
+    m = leafmap.Map(center=[center_lat, center_lon], zoom=8)
+    # Tambahkan basemap
+    m.add_basemap("OpenStreetMap")
+
+    # Tambahkan CSS untuk animasi kedip ke peta
+    folium.Element("""
+    <style>
+        @keyframes pulse {
+            0% { opacity: 1; }
+            50% { opacity: 0.4; }
+            100% { opacity: 1; }
+        }
+        .marker-pulse {
+            animation: pulse 1.5s infinite;
+        }
+        .marker-pulse-fast {
+            animation: pulse 0.8s infinite;
+        }
+    </style>
+    """).add_to(m)
+
+    # Potongan tabel panjang Route Test; pada mode lintasan tidak ikut layer marker titik/grid dan
+    # membawa kolom pembeda drive (trajectory.DRIVE_COLUMNS)
+    route_columns = list(dict.fromkeys(markers.MAP_COLUMNS + (trajectory.DRIVE_COLUMNS if route_tracks else [])))
+    view_route = longtable.long_view(data_long, data_dims, rows_route, route_columns) if has_route_data else None
+    route_points = None if route_tracks else view_route
+
+    # Membuat grup marker untuk clustering titik-titik yang berdekatan
+    fast_mode = marker_mode in (MARKER_MODE_GRID, MARKER_MODE_FAST)
+    if fast_mode:
+        # Satu payload kolumnar untuk semua titik; marker, ikon dan popup dibuat di browser.
+        # Mode grid menambahkan agregat per sel untuk setiap level zoom (qoe.spatialgrid)
+        grid_mode = marker_mode == MARKER_MODE_GRID
+        payload = markers.marker_payload(
+            [('Route Test', param_route, route_points),
+             ('Static Test', param_static, longtable.long_view(data_long, data_dims, rows_static, markers.MAP_COLUMNS) if has_static_data else None)],
+            color_map, grid=grid_mode)
+        if payload is not None:
+            layer = markers.GridMarkerLayer(payload) if grid_mode else markers.ColumnarMarkerCluster(payload)
+            layer.add_to(m)
+    else:
+        marker_cluster = MarkerCluster().add_to(m)
+
+    # Fungsi untuk membuat ikon berdasarkan jenis test dan operator dengan efek kedipan
+    def create_custom_icon(jenis_test, operator, nilai):
+        # Tentukan warna berdasarkan operator
+        color = color_map.get(operator, 'gray')
+
+        # Tentukan jenis ikon dan kelas animasi berdasarkan jenis test
+        if jenis_test == 'Route Test':
+            # Untuk Route Test, gunakan ikon pin lokasi dengan animasi pulse
+            icon_html = f"""
+            <div class="marker-pulse" style="animation-delay: {(hash(operator) % 5) * 0.2}s;">
+                <i class="fa fa-map-marker fa-2x" style="color:{color};"></i>
+            </div>
+            """
+            return folium.DivIcon(
+                html=icon_html,
+                icon_size=(30, 30),
+                icon_anchor=(15, 30)
+            )
+        else:
+            # Untuk Static Test, gunakan ikon wifi dengan animasi pulse
+            icon_html = f"""
+            <div class="marker-pulse-fast" style="animation-delay: {(hash(operator) % 3) * 0.3}s;">
+                <i class="fa fa-wifi fa-2x" style="color:{color};"></i>
+            </div>
+            """
+            return folium.DivIcon(
+                html=icon_html,
+                icon_size=(30, 30),
+                icon_anchor=(15, 15)
+            )
+
+    # Tambahkan marker untuk Route Test dengan animasi
+    if has_route_data and not fast_mode and not route_tracks:
+        for op in [op for op in operators if op in df_route_map.columns]:
+            # Filter data untuk operator ini yang tidak null
+            op_data = df_route_map.copy()
+            op_data = op_data[op_data[op].notna()]
+
+            if not op_data.empty:
+                for _, row in op_data.iterrows():
+                    # Format nilai untuk tampilan
+                    nilai = row[op]
+                    nilai_str = f"{nilai:.2f}" if isinstance(nilai, (int, float)) else str(nilai)
+
+                    popup_content = f"""
+                    <div style="font-family: Arial; font-size: 12px;">
+                        <b>Jenis Pengukuran:</b> Route Test<br>
+                        <b>Lokasi:</b> {row['Alamat']}<br>
+                        <b>Operator:</b> {op}<br>
+                        <b>Parameter:</b> {param_route}<br>
+                        <b>Nilai:</b> {nilai_str}<br>
+                        <b>Tanggal:</b> {row['Tanggal_str']}<br>
+                        {"<b>Kabupaten/Kota:</b> " + row['Kabupaten/Kota'] + "<br>" if 'Kabupaten/Kota' in op_data.columns else ""}
+                    </div>
+                    """
+
+                    # Buat marker dengan custom icon dan animasi
+                    folium.Marker(
+                        location=[row['Latitude'], row['Longitude']],
+                        icon=create_custom_icon('Route Test', op, nilai),
+                        popup=folium.Popup(popup_content, max_width=300),
+                        tooltip=f"Route Test: {op} - {row['Alamat']}"
+                    ).add_to(marker_cluster)
+
+    # Tambahkan marker untuk Static Test dengan animasi
+    if has_static_data and not fast_mode:
+        for op in [op for op in operators if op in df_static_map.columns]:
+            # Filter data untuk operator ini yang tidak null
+            op_data = df_static_map.copy()
+            op_data = op_data[op_data[op].notna()]
+
+            if not op_data.empty:
+                for _, row in op_data.iterrows():
+                    # Format nilai untuk tampilan
+                    nilai = row[op]
+                    nilai_str = f"{nilai:.2f}" if isinstance(nilai, (int, float)) else str(nilai)
+
+                    popup_content = f"""
+                    <div style="font-family: Arial; font-size: 12px;">
+                        <b>Jenis Pengukuran:</b> Static Test<br>
+                        <b>Lokasi:</b> {row['Alamat']}<br>
+                        <b>Operator:</b> {op}<br>
+                        <b>Parameter:</b> {param_static}<br>
+                        <b>Nilai:</b> {nilai_str}<br>
+                        <b>Tanggal:</b> {row['Tanggal_str']}<br>
+                        {"<b>Kabupaten/Kota:</b> " + row['Kabupaten/Kota'] + "<br>" if 'Kabupaten/Kota' in op_data.columns else ""}
+                    </div>
+                    """
+
+                    # Buat marker dengan custom icon dan animasi
+                    folium.Marker(
+                        location=[row['Latitude'], row['Longitude']],
+                        icon=create_custom_icon('Static Test', op, nilai),
+                        popup=folium.Popup(popup_content, max_width=300),
+                        tooltip=f"Static Test: {op} - {row['Alamat']}"
+                    ).add_to(marker_cluster)
+
+    # Lintasan Route Test: satu layer per operator, disederhanakan sesuai zoom dan diwarnai menurut Nilai
+    track_scale = None
+    if route_tracks and has_route_data:
+        tracks = trajectory.build_tracks(view_route, param_route)
+        if tracks:
+            for op in operators:
+                if op in tracks:
+                    markers.TrackLayer(tracks[op]).add_to(m)
+            first = next(iter(tracks.values()))
+            track_scale = (first['breaks'], first['palette'])
+
+    # Tambahkan legenda untuk operator dan jenis pengukuran
+    legend_html = """
+    <div style="position: fixed; bottom: 50px; right: 50px; z-index: 1000; background-color: white;
+                padding: 10px; border: 2px solid grey; border-radius: 5px">
+        <div style="margin-bottom: 5px;"><b>Operator:</b></div>
+    """
+
+    # Legenda untuk operator dengan animasi
+    for op in operators:
+        legend_html += f"""
+        <div style="margin-bottom: 3px;">
+            <i style="background:{color_map.get(op, 'gray')}; width: 12px; height: 12px; display: inline-block; border: 1px solid black;" 
+               class="marker-pulse"></i> {op}
+        </div>
+        """
+
+    # Legenda untuk jenis pengukuran dengan animasi
+    legend_html += """
+        <div style="margin-top: 10px; margin-bottom: 5px;"><b>Jenis Pengukuran:</b></div>
+    """
+    if route_tracks:
+        legend_html += """
+        <div style="margin-bottom: 3px;"><i class="fa fa-minus" style="color:gray;"></i> Route Test (lintasan)</div>
+        """
+    else:
+        legend_html += """
+        <div style="margin-bottom: 3px;" class="marker-pulse"><i class="fa fa-map-marker" style="color:gray;"></i> Route Test</div>
+        """
+    legend_html += """
+        <div style="margin-bottom: 3px;" class="marker-pulse-fast"><i class="fa fa-wifi" style="color:gray;"></i> Static Test</div>
+    """
+
+    # Skala warna lintasan (kelas kuantil Nilai, dari buruk ke baik sesuai arah parameter)
+    if track_scale is not None:
+        breaks, palette = track_scale
+        legend_html += f"""
+        <div style="margin-top: 10px; margin-bottom: 5px;"><b>Lintasan {param_route}:</b></div>
+        """
+        for c, color in enumerate(palette[:len(breaks) + 1]):
+            if c == 0:
+                rentang = f"&le; {breaks[0]:.2f}" if breaks else "semua nilai"
+            elif c == len(breaks):
+                rentang = f"&gt; {breaks[-1]:.2f}"
+            else:
+                rentang = f"{breaks[c - 1]:.2f} &ndash; {breaks[c]:.2f}"
+            legend_html += f"""
+        <div style="margin-bottom: 3px;">
+            <i style="background:{color}; width: 18px; height: 5px; display: inline-block;"></i> {rentang}
+        </div>
+        """
+    legend_html += """
+    </div>
+    """
+
+    m.add_html(html=legend_html, position="bottomright")
+
+    return m
@@ -0,0 +1,64 @@
+# Prakomputasi latar untuk tampilan per parameter: setelah satu rerun selesai, grafik,
+# ringkasan dan peta untuk parameter lain disiapkan di thread pool bersama dan disimpan di
+# cache render, sehingga mengganti parameter cukup berupa lookup. Job dibatalkan bila
+# filter (Bulan / Kabupaten / Alamat) berubah.
+import os
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_WORKERS = int(os.environ.get("QOE_PRECOMPUTE_WORKERS", "2"))
+
+
+def make_executor(max_workers=DEFAULT_WORKERS):
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="qoe-precompute")
+
+
+class UsageCounter:
+    # Hitungan pemilihan parameter lintas sesi, dipakai untuk mengurutkan prakomputasi
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, jenis, parameter):
+        with self._lock:
+            self._counts[(jenis, parameter)] += 1
+
+    def order(self, items):
+        # items: list (jenis, parameter); paling sering dipilih lebih dulu, urutan asli sebagai pemecah nilai kembar
+        with self._lock:
+            counts = dict(self._counts)
+        return sorted(items, key=lambda item: -counts.get(item, 0))
+
+
+class PrecomputeJob:
+    # Sekumpulan tugas untuk satu kunci (dataset + filter); cancel() menghentikan tugas yang belum mulai
+    def __init__(self, key):
+        self.key = key
+        self._cancelled = threading.Event()
+        self._futures = []
+
+    def submit(self, executor, tasks):
+        for task in tasks:
+            self._futures.append(executor.submit(self._run, task))
+        return self
+
+    def _run(self, task):
+        if self._cancelled.is_set():
+            return False
+        task()
+        return True
+
+    def cancel(self):
+        self._cancelled.set()
+        for future in self._futures:
+            future.cancel()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def progress(self):
+        # (selesai, total); tugas yang gagal dihitung selesai agar progres tetap berjalan
+        done = sum(1 for future in self._futures if future.done())
+        return done, len(self._futures)
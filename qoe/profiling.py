@@ -0,0 +1,176 @@
+# Instrumentasi opsional per tahap: waktu wall-clock, waktu CPU dan puncak memori (tracemalloc)
+# untuk setiap tahap satu rerun dashboard. Hasilnya ditampilkan sebagai waterfall dan ditulis
+# sebagai satu baris JSON per rerun agar persentil latensi bisa dihitung lintas sesi.
+#
+# Aktif lewat toggle di sidebar atau environment variable QOE_PROFILE=1.
+# Ringkasan persentil dari log: python -m qoe.profiling [path-log]
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+import pandas as pd
+
+from qoe import ingest
+
+ENABLED = os.environ.get("QOE_PROFILE", "0").lower() in ("1", "true", "yes")
+# tracemalloc memperlambat eksekusi cukup besar; bisa dimatikan terpisah
+TRACE_MEMORY = os.environ.get("QOE_PROFILE_MEMORY", "1").lower() in ("1", "true", "yes")
+LOG_PATH = os.environ.get("QOE_PROFILE_LOG", os.path.join(ingest.CACHE_DIR, "profile.jsonl"))
+
+# tracemalloc bersifat global per proses: dimulai oleh profiler aktif pertama dan dihentikan
+# oleh yang terakhir. Puncak memori per tahap mencakup sesi lain yang berjalan bersamaan.
+_trace_lock = threading.Lock()
+_trace_users = 0
+_log_lock = threading.Lock()
+
+
+def _start_tracing():
+    global _trace_users
+    with _trace_lock:
+        if _trace_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _trace_users += 1
+
+
+def _stop_tracing():
+    global _trace_users
+    with _trace_lock:
+        _trace_users -= 1
+        if _trace_users == 0 and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+class Profiler:
+    # Pencatat tahap berurutan: start(nama) menutup tahap sebelumnya dan membuka tahap baru,
+    # sehingga kode yang diukur tidak perlu diindentasi ulang. Jika tidak aktif semua metode no-op.
+    def __init__(self, enabled=ENABLED, trace_memory=TRACE_MEMORY):
+        self.enabled = enabled
+        self.trace_memory = enabled and trace_memory
+        self.stages = []
+        self.context = {}
+        self._current = None
+        self._finished = False
+        if self.enabled:
+            if self.trace_memory:
+                _start_tracing()
+            self._t0 = time.perf_counter()
+            self._c0 = time.process_time()
+
+    def start(self, name):
+        if not self.enabled or self._finished:
+            return
+        self._close()
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        self._current = (name, time.perf_counter(), time.process_time())
+
+    def _close(self):
+        if self._current is None:
+            return
+        name, wall0, cpu0 = self._current
+        wall1, cpu1 = time.perf_counter(), time.process_time()
+        self.stages.append({
+            'stage': name,
+            'start_ms': round((wall0 - self._t0) * 1000, 2),
+            'wall_ms': round((wall1 - wall0) * 1000, 2),
+            'cpu_ms': round((cpu1 - cpu0) * 1000, 2),
+            'peak_mb': round(tracemalloc.get_traced_memory()[1] / 2**20, 2) if self.trace_memory else None,
+        })
+        self._current = None
+
+    def finish(self):
+        # Tutup tahap terakhir dan kembalikan catatan rerun (None jika profiler tidak aktif)
+        if not self.enabled:
+            return None
+        if not self._finished:
+            self._close()
+            self._finished = True
+            self.total_ms = round((time.perf_counter() - self._t0) * 1000, 2)
+            self.total_cpu_ms = round((time.process_time() - self._c0) * 1000, 2)
+            if self.trace_memory:
+                _stop_tracing()
+        return self.record()
+
+    def record(self):
+        return {
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            **self.context,
+            'total_ms': self.total_ms,
+            'total_cpu_ms': self.total_cpu_ms,
+            'stages': self.stages,
+        }
+
+    def frame(self):
+        return pd.DataFrame(self.stages, columns=['stage', 'start_ms', 'wall_ms', 'cpu_ms', 'peak_mb'])
+
+
+def write_log(record, path=LOG_PATH):
+    # Tambahkan satu baris JSON; kegagalan menulis log tidak boleh mengganggu dashboard
+    if record is None:
+        return
+    line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with _log_lock, open(path, 'a', encoding='utf-8') as f:
+            f.write(line)
+    except OSError:
+        pass
+
+
+def waterfall_figure(stages):
+    # Waterfall: satu batang per tahap, dimulai pada offset tahap dalam rerun
+    import plotly.graph_objects as go
+
+    stages = list(reversed(stages))
+    fig = go.Figure(go.Bar(
+        y=[s['stage'] for s in stages],
+        x=[s['wall_ms'] for s in stages],
+        base=[s['start_ms'] for s in stages],
+        orientation='h',
+        customdata=[[s['cpu_ms'], s['peak_mb']] for s in stages],
+        hovertemplate="%{y}: %{x:.1f} ms (CPU %{customdata[0]:.1f} ms, puncak %{customdata[1]} MB)<extra></extra>",
+    ))
+    fig.update_layout(xaxis_title="Waktu sejak awal rerun (ms)", yaxis_title="Tahap",
+                      height=80 + 30 * len(stages), margin=dict(t=20, b=40))
+    return fig
+
+
+def read_log(path=LOG_PATH):
+    # Satu baris per (rerun, tahap); baris rusak dilewati
+    rows = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            rows.append({'stage': '(total)', 'wall_ms': record.get('total_ms'), 'cpu_ms': record.get('total_cpu_ms')})
+            rows.extend({'stage': s['stage'], 'wall_ms': s['wall_ms'], 'cpu_ms': s['cpu_ms'],
+                         'peak_mb': s.get('peak_mb')} for s in record.get('stages', []))
+    return pd.DataFrame(rows, columns=['stage', 'wall_ms', 'cpu_ms', 'peak_mb'])
+
+
+def percentiles(log, quantiles=(0.5, 0.9, 0.99)):
+    # Persentil wall-clock per tahap (ms) beserta jumlah rerun
+    grouped = log.groupby('stage', sort=False)['wall_ms']
+    table = grouped.quantile(list(quantiles)).unstack()
+    table.columns = [f"p{int(q * 100)}" for q in quantiles]
+    table.insert(0, 'n', grouped.size())
+    return table.round(1)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    path = argv[0] if argv else LOG_PATH
+    if not os.path.exists(path):
+        print(f"Log '{path}' tidak ditemukan.", file=sys.stderr)
+        return 1
+    print(percentiles(read_log(path)).to_string())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
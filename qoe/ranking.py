@@ -0,0 +1,18 @@
+# Peringkat top-k tanpa mengurutkan seluruh tabel: argpartition O(n) memilih k kandidat, lalu
+# hanya k baris tersebut yang diurutkan. Dipakai peringkat Before/After dan skor QoE.
+import numpy as np
+
+
+def top_k(frame, scores, k):
+    # k baris frame dengan scores tertinggi (array sejajar baris frame); NaN tidak ikut diperingkat
+    candidates = np.flatnonzero(~np.isnan(scores))
+    if len(candidates) == 0 or k <= 0:
+        return frame.iloc[:0]
+    candidate_scores = scores[candidates]
+    if k < len(candidates):
+        part = np.argpartition(-candidate_scores, k - 1)[:k]
+    else:
+        part = np.arange(len(candidates))
+    # Urutan akhir hanya untuk k baris terpilih; posisi asli sebagai pemecah nilai kembar
+    order = part[np.lexsort((candidates[part], -candidate_scores[part]))]
+    return frame.iloc[candidates[order]].reset_index(drop=True)
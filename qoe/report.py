@@ -0,0 +1,268 @@
+# Generator laporan batch tanpa Streamlit: untuk setiap kombinasi Bulan x Kabupaten/Kota x
+# Jenis Pengukuran x Parameter ditulis grafik batang (HTML/PNG), peta (HTML) dan tabel
+# perbandingan (CSV). Kombinasi dibagi ke process pool; output yang sudah dibuat dari
+# input dengan hash yang sama dilewati (dicatat di manifest.json).
+#
+# Pemakaian: python -m qoe.report data.csv --out laporan --workers 4 --formats html,png,csv
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from qoe import cube, filters, ingest, longtable, panels
+
+# Naikkan jika isi/format output berubah agar laporan lama dibuat ulang
+REPORT_VERSION = 3
+MANIFEST_FILE = 'manifest.json'
+FORMATS = ['html', 'png', 'csv']
+JENIS_PENGUKURAN = ['Route Test', 'Static Test']
+
+# Data yang dimuat sekali per proses worker (lihat _init_worker)
+_STATE = {}
+
+
+def slugify(text):
+    slug = re.sub(r'[^0-9A-Za-z]+', '-', str(text)).strip('-').lower()
+    return slug or 'kosong'
+
+
+def combo_dir(bulan, kabupaten, jenis, parameter):
+    return os.path.join(slugify(bulan), slugify(kabupaten), slugify(jenis), slugify(parameter))
+
+
+def output_files(combo, formats):
+    # Path relatif (terhadap direktori output) untuk satu kombinasi
+    base = combo_dir(*combo)
+    files = []
+    if 'html' in formats:
+        files += [os.path.join(base, 'bar.html'), os.path.join(base, 'map.html')]
+    if 'png' in formats:
+        files.append(os.path.join(base, 'bar.png'))
+    if 'csv' in formats:
+        files.append(os.path.join(base, 'perbandingan.csv'))
+    return files
+
+
+def png_available():
+    # Ekspor PNG plotly membutuhkan paket opsional kaleido
+    try:
+        import kaleido  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def load_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST_FILE), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, MANIFEST_FILE)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def is_up_to_date(manifest, out_dir, relpath, file_hash):
+    entry = manifest.get(relpath)
+    return (entry is not None
+            and entry.get('input') == file_hash
+            and entry.get('version') == REPORT_VERSION
+            and os.path.exists(os.path.join(out_dir, relpath)))
+
+
+def _write_text(path, text):
+    # Tulis lewat file sementara agar output yang terputus tidak dianggap selesai
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def load_frame(csv_path, file_hash):
+    # Snapshot Parquet sudah ditulis oleh proses utama; parse CSV hanya jika snapshot tidak ada
+    path = ingest.snapshot_path(file_hash)
+    if os.path.exists(path):
+        try:
+            return pd.read_parquet(path)
+        except Exception:
+            pass
+    return ingest.parse_csv(csv_path)
+
+
+def _init_worker(csv_path, file_hash):
+    df = load_frame(csv_path, file_hash)
+    data_long, data_dims = longtable.build_long(df, ingest.OPERATOR_COLUMNS)
+    _STATE.update(
+        df=df,
+        cube=cube.build_cube(df, ingest.OPERATOR_COLUMNS),
+        long=data_long,
+        dims=data_dims,
+        index=filters.FilterIndex(df),
+        operators=[op for op in ingest.OPERATOR_COLUMNS if op in df.columns],
+    )
+
+
+def enumerate_combos(index):
+    # Semua kombinasi (bulan, kabupaten, jenis, parameter) yang benar-benar memiliki data
+    combos = []
+    for bulan in index.unique('Bulan'):
+        rows_bulan = index.rows_for('Bulan', [bulan])
+        for kabupaten in index.unique('Kabupaten/Kota', rows_bulan):
+            rows_kab = filters.intersect(rows_bulan, index.rows_for('Kabupaten/Kota', [kabupaten]))
+            for jenis in JENIS_PENGUKURAN:
+                rows_jenis = filters.intersect(rows_kab, index.rows_for('Jenis Pengukuran', [jenis]))
+                for parameter in index.unique('Parameter', rows_jenis):
+                    combos.append((bulan, kabupaten, jenis, parameter))
+    return combos
+
+
+def render_combo(job):
+    # Dijalankan di worker: tulis output yang diminta untuk satu kombinasi, kembalikan path relatif
+    combo, out_dir, pending = job
+    bulan, kabupaten, jenis, parameter = combo
+    index = _STATE['index']
+    operators = _STATE['operators']
+
+    rows = index.rows_for('Bulan', [bulan])
+    for dim, value in [('Kabupaten/Kota', kabupaten), ('Jenis Pengukuran', jenis), ('Parameter', parameter)]:
+        rows = filters.intersect(rows, index.rows_for(dim, [value]))
+
+    base = os.path.join(out_dir, combo_dir(*combo))
+    os.makedirs(base, exist_ok=True)
+    written = []
+
+    bar_files = [p for p in pending if os.path.basename(p) in ('bar.html', 'bar.png')]
+    if bar_files:
+        fig = panels.create_bar_figure(_STATE['long'], _STATE['dims'], rows, parameter,
+                                       f"{jenis}, {kabupaten}, {bulan}", operators)
+        if fig is not None:
+            for relpath in bar_files:
+                path = os.path.join(out_dir, relpath)
+                if relpath.endswith('.html'):
+                    _write_text(path, fig.to_html(include_plotlyjs='cdn'))
+                else:
+                    fig.write_image(path)
+                written.append(relpath)
+
+    map_files = [p for p in pending if os.path.basename(p) == 'map.html']
+    if map_files:
+        # Peta hanya berisi satu jenis pengukuran; jenis lainnya diberi posisi kosong
+        kosong = np.empty(0, dtype='int64')
+        rows_route, rows_static = (rows, kosong) if jenis == 'Route Test' else (kosong, rows)
+        combined_map = panels.create_combined_map(_STATE['df'], _STATE['long'], _STATE['dims'],
+                                                  rows_route, rows_static, parameter, parameter,
+                                                  panels.MARKER_MODE_GRID, operators)
+        if combined_map is not None:
+            combined_map.add_layer_control()
+            _write_text(os.path.join(out_dir, map_files[0]), combined_map.to_html())
+            written.append(map_files[0])
+
+    csv_files = [p for p in pending if p.endswith('.csv')]
+    if csv_files:
+        summary = cube.query(_STATE['cube'], operators, parameter, jenis, bulan, [kabupaten])
+        table = cube.comparison_table(summary, parameter, jenis)
+        if table is not None:
+            _write_text(os.path.join(out_dir, csv_files[0]), table.to_csv(index=False))
+            written.append(csv_files[0])
+
+    return written
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m qoe.report',
+        description="Buat laporan QoE statis (grafik, peta, tabel perbandingan) untuk semua "
+                    "kombinasi Bulan x Kabupaten/Kota x Parameter.")
+    parser.add_argument('csv', help="File CSV data QoE")
+    parser.add_argument('--out', default='laporan', help="Direktori output (default: laporan)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Jumlah proses worker (default: jumlah CPU)")
+    parser.add_argument('--formats', default='html,csv',
+                        help="Format output dipisah koma: html, png, csv (default: html,csv)")
+    parser.add_argument('--force', action='store_true', help="Buat ulang semua output walau sudah up to date")
+    args = parser.parse_args(argv)
+
+    args.formats = [f.strip().lower() for f in args.formats.split(',') if f.strip()]
+    unknown = sorted(set(args.formats) - set(FORMATS))
+    if unknown:
+        parser.error(f"format tidak dikenal: {', '.join(unknown)}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    start = time.perf_counter()
+
+    with open(args.csv, 'rb') as f:
+        data = f.read()
+    file_hash = ingest.content_hash(data)
+    # Tulis snapshot sekali di proses utama agar worker cukup membaca Parquet
+    df = ingest.load_snapshot(data, file_hash)
+    del data
+
+    missing = [col for col in ['Bulan', 'Kabupaten/Kota', 'Jenis Pengukuran', 'Parameter'] if col not in df.columns]
+    if missing:
+        print(f"Kolom berikut tidak ditemukan: {', '.join(missing)}", file=sys.stderr)
+        return 1
+
+    formats = args.formats
+    if 'png' in formats and not png_available():
+        print("Peringatan: paket 'kaleido' tidak terpasang, output PNG dilewati.", file=sys.stderr)
+        formats = [f for f in formats if f != 'png']
+
+    os.makedirs(args.out, exist_ok=True)
+    manifest = {} if args.force else load_manifest(args.out)
+
+    combos = enumerate_combos(filters.FilterIndex(df))
+    del df
+    jobs = []
+    n_skipped = 0
+    for combo in combos:
+        files = output_files(combo, formats)
+        pending = [p for p in files if not is_up_to_date(manifest, args.out, p, file_hash)]
+        n_skipped += len(files) - len(pending)
+        if pending:
+            jobs.append((combo, args.out, pending))
+
+    print(f"{len(combos)} kombinasi, {len(jobs)} perlu dibuat, {n_skipped} output sudah up to date.")
+
+    n_written = 0
+    executor = None
+    try:
+        if args.workers <= 1 or len(jobs) <= 1:
+            _init_worker(args.csv, file_hash)
+            results = map(render_combo, jobs)
+        else:
+            executor = ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                                           initargs=(args.csv, file_hash))
+            results = executor.map(render_combo, jobs, chunksize=max(1, len(jobs) // (args.workers * 8)))
+
+        for i, written in enumerate(results, 1):
+            for relpath in written:
+                manifest[relpath] = {'input': file_hash, 'version': REPORT_VERSION}
+            n_written += len(written)
+            print(f"[{i}/{len(jobs)}] {combo_dir(*jobs[i - 1][0])}")
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        # Manifest disimpan juga saat terhenti agar output yang sudah selesai tidak dibuat ulang
+        save_manifest(args.out, manifest)
+
+    print(f"Selesai: {n_written} file ditulis ke {args.out} dalam {time.perf_counter() - start:.1f} detik.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,87 @@
+# Skor QoE gabungan per (Alamat, Operator) lintas semua parameter Speed / Web / Video / Route Test.
+# Rata-rata Nilai disusun dalam satu pivot (baris = lokasi x operator, kolom = (Test, Parameter)),
+# lalu setiap parameter dinormalisasi menjadi persentil peringkat setelah dikalikan arah
+# kualitasnya (qoe.beforeafter.direction), sehingga DL speed tinggi dan load time rendah sama-sama
+# bernilai baik. Skor per Test = rata-rata persentil parameternya; skor gabungan = rata-rata
+# berbobot skor per Test. Parameter tanpa arah (Distance) tidak ikut dinilai, dan nilai 0
+# (tidak terukur, lihat qoe.beforeafter.measured) tidak ikut dirata-rata maupun diperingkat.
+import numpy as np
+import pandas as pd
+
+from qoe import beforeafter, longtable, ranking
+
+# Bobot tiap jenis Test dalam skor gabungan; Test yang tidak tercantum tidak ikut dinilai
+TEST_WEIGHTS = {'Speed Test': 1.0, 'Web Test': 1.0, 'Video Test': 1.0, 'Route Test': 1.0}
+
+SCORE_COLUMN = 'Skor QoE'
+INDEX_COLUMNS = ['Alamat', 'Operator']
+
+
+def parameter_matrix(long, dims, rows=None):
+    # Pivot rata-rata Nilai dari tabel panjang kanonik (qoe.longtable); rows membatasi baris data
+    # (None = semua baris)
+    if not all(col in dims.columns for col in ['Alamat', 'Test', 'Parameter']):
+        return pd.DataFrame()
+
+    nilai = long['Nilai'].to_numpy()
+    mask = beforeafter.measured(nilai) & longtable.row_mask(long, dims, rows)
+
+    picked = long['row'].to_numpy()[mask]
+    values = pd.DataFrame({col: dims[col].array.take(picked) for col in ['Alamat', 'Test', 'Parameter']})
+    values['Operator'] = long['Operator'].array[mask]
+    values['Nilai'] = nilai[mask].astype('float64')
+    return values.pivot_table(index=INDEX_COLUMNS, columns=['Test', 'Parameter'], values='Nilai',
+                              aggfunc='mean', observed=True)
+
+
+def composite_scores(matrix, test_weights=TEST_WEIGHTS):
+    # Skor 0-100 per baris pivot: skor gabungan, skor per Test, dan jumlah parameter yang terukur
+    if matrix.empty:
+        return pd.DataFrame(columns=INDEX_COLUMNS + [SCORE_COLUMN, 'Jumlah Parameter'])
+
+    tests = matrix.columns.get_level_values('Test').astype(str)
+    signs = beforeafter.direction(matrix.columns.get_level_values('Parameter'))
+    use = (signs != 0) & np.asarray(tests.isin(list(test_weights)))
+    matrix, tests, signs = matrix.loc[:, use], tests[use], signs[use]
+
+    # Persentil peringkat tengah per parameter (0 = terburuk, 1 = terbaik, 0.5 = median)
+    normalized = ((matrix * signs).rank() - 0.5) / matrix.count()
+    values = normalized.to_numpy(dtype='float64')
+    present = ~np.isnan(values)
+
+    # Matriks keanggotaan parameter x Test: skor per Test = rata-rata parameter yang terukur
+    present_tests = set(tests)
+    test_names = [t for t in test_weights if t in present_tests]
+    membership = (np.asarray(tests)[:, None] == np.asarray(test_names)[None, :]).astype('float64')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        per_test = (np.nan_to_num(values) @ membership) / (present @ membership)
+        weights = np.array([test_weights[t] for t in test_names])
+        measured = ~np.isnan(per_test)
+        composite = np.nansum(per_test * weights, axis=1) / (measured @ weights)
+
+    result = matrix.index.to_frame(index=False)
+    result['Alamat'] = result['Alamat'].astype(str)
+    result['Operator'] = result['Operator'].astype(str)
+    result[SCORE_COLUMN] = composite * 100
+    for j, test in enumerate(test_names):
+        result[f"Skor {test}"] = per_test[:, j] * 100
+    result['Jumlah Parameter'] = present.sum(axis=1)
+    return result
+
+
+def top_k(scores, k, best=True, column=SCORE_COLUMN):
+    # k baris dengan skor tertinggi (atau terendah)
+    values = scores[column].to_numpy(dtype='float64')
+    return ranking.top_k(scores, values if best else -values, k)
+
+
+def operator_summary(scores, operators=None):
+    # Rata-rata skor per operator lintas lokasi, diurutkan dari skor gabungan tertinggi
+    if scores.empty:
+        return pd.DataFrame()
+    score_columns = [col for col in scores.columns if col.startswith('Skor ')]
+    table = scores.groupby('Operator', sort=False)[score_columns].mean()
+    table.insert(0, 'Jumlah Lokasi', scores.groupby('Operator', sort=False).size())
+    if operators is not None:
+        table = table.reindex([op for op in operators if op in table.index])
+    return table.sort_values(SCORE_COLUMN, ascending=False)
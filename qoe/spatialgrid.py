@@ -0,0 +1,119 @@
+# Agregasi spasial multi-resolusi untuk peta QoE: titik (Latitude, Longitude) dibinning ke grid
+# berbasis tile Web Mercator untuk setiap level zoom, dengan agregat per sel per operator
+# (jumlah titik, rata-rata, min, maks). Peta hanya merender sel level zoom aktif yang berada di
+# dalam viewport; titik individual baru ditampilkan pada zoom dekat (lihat qoe.markers.GridMarkerLayer).
+import os
+
+import numpy as np
+
+# Level grid dibangun untuk zoom MIN_ZOOM .. POINT_ZOOM - 1; zoom lebih jauh memakai level MIN_ZOOM
+MIN_ZOOM = 4
+# Zoom mulai titik individual ditampilkan sebagai pengganti sel grid
+POINT_ZOOM = int(os.environ.get("QOE_MAP_POINT_ZOOM", "13"))
+# Satu tile 256 px dibagi 2^CELL_SUBDIVISION sel per sisi (2 -> sel 64 px)
+CELL_SUBDIVISION = 2
+
+MAX_LATITUDE = 85.05112878
+
+
+def project(lat, lon):
+    # Koordinat Web Mercator ternormalisasi [0, 1) (dikali 256 * 2^zoom = piksel pada zoom tersebut)
+    lat_rad = np.radians(np.clip(lat, -MAX_LATITUDE, MAX_LATITUDE))
+    x = (np.asarray(lon, dtype='float64') + 180.0) / 360.0
+    y = (1.0 - np.log(np.tan(lat_rad) + 1.0 / np.cos(lat_rad)) / np.pi) / 2.0
+    return x, y
+
+
+def cell_xy(lat, lon, zoom):
+    # Indeks sel (x, y) seperti penomoran tile slippy map pada zoom + CELL_SUBDIVISION
+    n = 2 ** (zoom + CELL_SUBDIVISION)
+    x, y = project(lat, lon)
+    return np.clip(np.floor(x * n), 0, n - 1).astype('int64'), np.clip(np.floor(y * n), 0, n - 1).astype('int64')
+
+
+def _group(keys, columns):
+    # Agregasi per kunci dengan satu sort + reduceat; columns: {nama: (array, ufunc)}
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]]) if len(keys) else np.empty(0, dtype='int64')
+    grouped = {name: ufunc.reduceat(values[order], starts) if len(starts) else values[:0]
+               for name, (values, ufunc) in columns.items()}
+    return sorted_keys[starts], grouped
+
+
+def _json_matrix(values, decimals=2):
+    # Matriks float (sel x operator) -> list bersarang untuk JSON dengan NaN sebagai null
+    values = np.round(values, decimals)
+    return np.where(np.isnan(values), None, values).tolist()
+
+
+def _level_payload(zoom, n, n_ops, test, y, x, op, agg):
+    # Entri (sel, operator) terurut per sel -> satu baris per sel dengan matriks per operator
+    cell_key = (test * n + y) * n + x
+    cells, cell_idx = np.unique(cell_key, return_inverse=True)
+    n_cells = len(cells)
+    shape = (n_cells, n_ops)
+
+    op_count = np.zeros(shape, dtype='int64')
+    op_count[cell_idx, op] = agg['count']
+    op_mean, op_min, op_max = np.full(shape, np.nan), np.full(shape, np.nan), np.full(shape, np.nan)
+    op_mean[cell_idx, op] = agg['sum'] / agg['count']
+    op_min[cell_idx, op] = agg['min']
+    op_max[cell_idx, op] = agg['max']
+
+    counts = op_count.sum(axis=1)
+    # Posisi marker sel = centroid titik di dalamnya (bukan pusat sel) agar tetap di dekat data
+    centroid_lat = np.bincount(cell_idx, weights=agg['sum_lat'], minlength=n_cells) / counts
+    centroid_lon = np.bincount(cell_idx, weights=agg['sum_lon'], minlength=n_cells) / counts
+
+    return {
+        'zoom': zoom,
+        'x': (cells % n).tolist(),
+        'y': (cells // n % n).tolist(),
+        'test': (cells // (n * n)).tolist(),
+        'lat': centroid_lat.tolist(),
+        'lon': centroid_lon.tolist(),
+        'count': counts.tolist(),
+        'op_count': op_count.tolist(),
+        'op_mean': _json_matrix(op_mean),
+        'op_min': _json_matrix(op_min),
+        'op_max': _json_matrix(op_max),
+    }
+
+
+def build_grid(lat, lon, nilai, op, test, n_ops, min_zoom=MIN_ZOOM, point_zoom=POINT_ZOOM):
+    # Piramida grid untuk semua level zoom di bawah point_zoom; titik tanpa koordinat dilewati.
+    # Titik diagregasi sekali pada level terhalus, lalu setiap level yang lebih kasar dibangun
+    # dari sel level di bawahnya (indeks sel digeser satu bit), bukan dari titik mentah.
+    lat = np.asarray(lat, dtype='float64')
+    lon = np.asarray(lon, dtype='float64')
+    nilai = np.asarray(nilai, dtype='float64')
+    op = np.asarray(op, dtype='int64')
+    test = np.asarray(test, dtype='int64')
+    valid = np.isfinite(lat) & np.isfinite(lon) & np.isfinite(nilai)
+    lat, lon, nilai, op, test = lat[valid], lon[valid], nilai[valid], op[valid], test[valid]
+
+    levels = []
+    zooms = list(range(min_zoom, point_zoom))
+    if zooms:
+        x, y = cell_xy(lat, lon, zooms[-1])
+        agg = {'count': np.ones(len(nilai), dtype='int64'), 'sum': nilai, 'min': nilai, 'max': nilai,
+               'sum_lat': lat, 'sum_lon': lon}
+    for zoom in reversed(zooms):
+        n = 2 ** (zoom + CELL_SUBDIVISION)
+        # Kunci (test, y, x, operator) untuk level ini; level berikutnya cukup menggeser x dan y
+        key = ((test * n + y) * n + x) * n_ops + op
+        key, agg = _group(key, {'count': (agg['count'], np.add), 'sum': (agg['sum'], np.add),
+                                'min': (agg['min'], np.minimum), 'max': (agg['max'], np.maximum),
+                                'sum_lat': (agg['sum_lat'], np.add), 'sum_lon': (agg['sum_lon'], np.add)})
+        op, cell = key % n_ops, key // n_ops
+        x, y, test = cell % n, cell // n % n, cell // (n * n)
+        levels.append(_level_payload(zoom, n, n_ops, test, y, x, op, agg))
+        x, y = x >> 1, y >> 1
+
+    return {
+        'min_zoom': min_zoom,
+        'point_zoom': point_zoom,
+        'subdivision': CELL_SUBDIVISION,
+        'levels': levels[::-1],
+    }
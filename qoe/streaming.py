@@ -0,0 +1,116 @@
+# Ingest bertahap untuk log drive-test berukuran besar: CSV dibaca per chunk dengan
+# ukuran yang diturunkan dari batas memori, setiap chunk divalidasi dan diberi tipe,
+# kubus agregat diperbarui secara inkremental, lalu chunk disimpan sebagai partisi
+# Parquet. Puncak memori saat ingest hanya sebesar satu chunk.
+#
+# Batas memori hanya berlaku selama ingest: read_dataset memuat kembali semua partisi sebagai
+# satu frame bertipe (categorical + float32), dan tabel panjang, indeks filter serta penampil
+# data mentah dibangun dari frame tersebut. CSV boleh lebih besar dari RAM, tetapi data
+# setelah diberi tipe harus muat di memori; dataset bertipe yang lebih besar dari RAM tidak
+# didukung.
+import hashlib
+import os
+import shutil
+
+import pandas as pd
+
+from qoe import cube, ingest
+
+# Batas memori default untuk satu chunk ingest (MB)
+DEFAULT_MEMORY_MB = int(os.environ.get("QOE_STREAM_MEMORY_MB", "256"))
+
+# Jumlah baris contoh untuk memperkirakan ukuran per baris
+PROBE_ROWS = 1000
+MIN_CHUNK_ROWS = 1000
+
+REQUIRED_COLUMNS = ['Tanggal', 'Jenis Pengukuran', 'Parameter', 'Alamat', 'Latitude', 'Longitude']
+
+CUBE_FILE = "cube.parquet"
+PARTS_DIR = "parts"
+
+
+def dataset_dir(file_hash):
+    return os.path.join(ingest.CACHE_DIR, f"{file_hash}-v{ingest.SCHEMA_VERSION}.parts")
+
+
+def is_ingested(file_hash):
+    return os.path.isdir(os.path.join(dataset_dir(file_hash), PARTS_DIR))
+
+
+def path_hash(path):
+    # Kunci murah untuk file di server: path, ukuran dan waktu modifikasi (tanpa membaca isi file)
+    stat = os.stat(path)
+    key = f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}"
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def validate_columns(chunk):
+    missing = [col for col in REQUIRED_COLUMNS if col not in chunk.columns]
+    if missing:
+        raise ValueError(f"Kolom {', '.join(repr(c) for c in missing)} tidak ditemukan dalam file CSV.")
+
+
+def chunk_rows_for(handle, memory_mb):
+    # Perkirakan jumlah baris per chunk dari ukuran memori baris contoh
+    start = handle.tell()
+    probe = pd.read_csv(handle, nrows=PROBE_ROWS)
+    handle.seek(start)
+    per_row = max(probe.memory_usage(deep=True).sum() / max(len(probe), 1), 1)
+    # Parsing mentah, frame bertipe dan nilai format panjang untuk kubus hidup bersamaan (~4x)
+    return max(MIN_CHUNK_ROWS, int(memory_mb * 2 ** 20 / (per_row * 4)))
+
+
+def stream_ingest(source, file_hash, memory_mb=DEFAULT_MEMORY_MB, progress=None):
+    # source: path file atau objek file biner yang bisa di-seek; progress(fraksi) dipanggil per chunk
+    final_dir = dataset_dir(file_hash)
+    if is_ingested(file_hash):
+        return final_dir
+
+    handle = open(source, "rb") if isinstance(source, (str, os.PathLike)) else source
+    tmp_dir = f"{final_dir}.{os.getpid()}.tmp"
+    try:
+        handle.seek(0, os.SEEK_END)
+        total_bytes = max(handle.tell(), 1)
+        handle.seek(0)
+        chunk_rows = chunk_rows_for(handle, memory_mb)
+
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(os.path.join(tmp_dir, PARTS_DIR))
+
+        data_cube = None
+        row_offset = 0
+        reader = pd.read_csv(handle, dtype=ingest.CSV_DTYPES, chunksize=chunk_rows)
+        for i, chunk in enumerate(reader):
+            if i == 0:
+                validate_columns(chunk)
+            chunk = ingest.type_frame(chunk.reset_index(drop=True))
+
+            data_cube = cube.update_cube(data_cube, chunk, ingest.OPERATOR_COLUMNS, row_offset)
+            chunk.to_parquet(os.path.join(tmp_dir, PARTS_DIR, f"part-{i:05d}.parquet"), index=False)
+            row_offset += len(chunk)
+
+            if progress is not None:
+                progress(min(handle.tell() / total_bytes, 1.0))
+
+        if data_cube is not None:
+            data_cube.to_parquet(os.path.join(tmp_dir, CUBE_FILE), index=False)
+        os.replace(tmp_dir, final_dir)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        if handle is not source:
+            handle.close()
+
+    return final_dir
+
+
+def read_dataset(file_hash, columns=None):
+    # Baca semua partisi bertipe (urut sesuai nomor partisi) sebagai satu frame di memori
+    return pd.read_parquet(os.path.join(dataset_dir(file_hash), PARTS_DIR), columns=columns)
+
+
+def read_cube(file_hash):
+    # Kubus yang dibangun bertahap saat ingest (None jika file tidak di-ingest bertahap)
+    path = os.path.join(dataset_dir(file_hash), CUBE_FILE)
+    if not os.path.exists(path):
+        return None
+    return pd.read_parquet(path)
@@ -0,0 +1,175 @@
+# Lintasan Route Test untuk peta QoE: sampel route test dikelompokkan menjadi lintasan terurut
+# per drive (Alamat, Tanggal, Keterangan) dan Operator, lalu disederhanakan dengan Douglas-Peucker tervektorisasi. Setiap titik
+# mendapat nilai "kepentingan" (jarak saat titik tersebut dipertahankan, dalam koordinat Web
+# Mercator ternormalisasi), sehingga penyederhanaan untuk zoom apa pun cukup berupa ambang:
+# titik dipakai pada zoom z jika kepentingan * 256 * 2^z >= TOLERANCE_PX.
+# Segmen diwarnai menurut rata-rata Nilai sampel yang dicakupnya (lihat qoe.markers.TrackLayer).
+# Nilai 0 (tidak terukur, lihat qoe.beforeafter.measured) tidak ikut digambar maupun menentukan
+# batas kelas warna.
+import numpy as np
+import pandas as pd
+
+from qoe import beforeafter, spatialgrid
+
+# Toleransi penyederhanaan dalam piksel layar
+TOLERANCE_PX = 1.5
+# Zoom terdekat yang didukung peta; titik yang tidak penting bahkan pada zoom ini dibuang
+MAX_ZOOM = 18
+
+# Palet kelas nilai dari buruk ke baik; parameter tanpa arah memakai palet berurutan
+QUALITY_PALETTE = ['#d7191c', '#fdae61', '#ffffbf', '#a6d96a', '#1a9641']
+NEUTRAL_PALETTE = ['#eff3ff', '#bdd7e7', '#6baed6', '#3182bd', '#08519c']
+
+# Kepentingan titik ujung lintasan (selalu dipertahankan); nilai hingga untuk JSON
+ENDPOINT_IMPORTANCE = 1.0
+
+# Kolom yang membedakan satu drive: pengulangan rute pada tanggal lain atau fase Before/After
+# menjadi lintasan tersendiri, bukan disambung ke drive sebelumnya
+DRIVE_COLUMNS = ['Alamat', 'Tanggal_str', 'Keterangan']
+
+
+def min_importance(max_zoom=MAX_ZOOM, tolerance_px=TOLERANCE_PX):
+    return tolerance_px / (256.0 * 2 ** max_zoom)
+
+
+def _segment_distance(px, py, ax, ay, bx, by):
+    # Jarak titik (px, py) ke segmen a-b, semua berupa array dengan panjang sama
+    dx, dy = bx - ax, by - ay
+    length2 = dx * dx + dy * dy
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = np.where(length2 > 0, ((px - ax) * dx + (py - ay) * dy) / length2, 0.0)
+    t = np.clip(t, 0.0, 1.0)
+    return np.hypot(px - (ax + t * dx), py - (ay + t * dy))
+
+
+def dp_importance(x, y, starts, ends, floor=0.0):
+    # Douglas-Peucker untuk semua lintasan sekaligus: setiap iterasi memproses seluruh interval
+    # aktif (dari semua lintasan) secara tervektorisasi. starts/ends: indeks titik pertama dan
+    # terakhir tiap lintasan. Kepentingan titik dibatasi oleh kepentingan induknya agar monoton
+    # (titik hanya muncul jika semua titik pemecah di atasnya juga muncul). Interval dengan jarak
+    # maksimum di bawah floor tidak dipecah lagi (titik di dalamnya berkepentingan 0).
+    importance = np.zeros(len(x), dtype='float64')
+    importance[starts] = ENDPOINT_IMPORTANCE
+    importance[ends] = ENDPOINT_IMPORTANCE
+
+    seg_a, seg_b = np.asarray(starts, dtype='int64'), np.asarray(ends, dtype='int64')
+    parent = np.full(len(seg_a), ENDPOINT_IMPORTANCE)
+    while True:
+        active = seg_b - seg_a >= 2
+        seg_a, seg_b, parent = seg_a[active], seg_b[active], parent[active]
+        if len(seg_a) == 0:
+            break
+
+        # Indeks titik interior semua interval, berurutan per interval
+        lengths = seg_b - seg_a - 1
+        seg_id = np.repeat(np.arange(len(seg_a)), lengths)
+        offsets = np.cumsum(lengths) - lengths
+        idx = seg_a[seg_id] + 1 + (np.arange(len(seg_id)) - offsets[seg_id])
+
+        a, b = seg_a[seg_id], seg_b[seg_id]
+        dist = _segment_distance(x[idx], y[idx], x[a], y[a], x[b], y[b])
+        seg_max = np.maximum.reduceat(dist, offsets)
+        # Posisi maksimum pertama per interval
+        is_max = np.flatnonzero(dist == seg_max[seg_id])
+        max_seg = seg_id[is_max]
+        split = idx[is_max[np.r_[True, max_seg[1:] != max_seg[:-1]]]]
+
+        keep = seg_max > floor
+        split_importance = np.minimum(seg_max, parent)
+        importance[split[keep]] = split_importance[keep]
+
+        seg_a, seg_b, split, parent = seg_a[keep], seg_b[keep], split[keep], split_importance[keep]
+        seg_a, seg_b = np.concatenate([seg_a, split]), np.concatenate([split, seg_b])
+        parent = np.concatenate([parent, parent])
+    return importance
+
+
+def color_scale(nilai, parameter, n_classes=len(QUALITY_PALETTE)):
+    # Batas kelas (kuantil) dan palet sesuai arah kualitas parameter
+    finite = nilai[np.isfinite(nilai)]
+    breaks = np.quantile(finite, np.linspace(0, 1, n_classes + 1)[1:-1]) if len(finite) else np.empty(0)
+    sign = beforeafter.direction([parameter])[0]
+    if sign == 0:
+        palette = NEUTRAL_PALETTE
+    else:
+        palette = QUALITY_PALETTE if sign > 0 else QUALITY_PALETTE[::-1]
+    return np.round(breaks, 2).tolist(), list(palette)
+
+
+def _drive_labels(view, columns, codes):
+    # Label per drive untuk tooltip: "Alamat (Tanggal, Keterangan)", nilai kosong dilewati
+    first = np.unique(codes, return_index=True)[1]
+    parts = [view[col].astype(object).to_numpy()[first] for col in columns]
+    labels = []
+    for values in zip(*parts):
+        values = [str(v) for v in values if not pd.isna(v)]
+        labels.append(f"{values[0]} ({', '.join(values[1:])})" if len(values) > 1 else ''.join(values))
+    return labels
+
+
+def build_tracks(view, parameter, max_zoom=MAX_ZOOM):
+    # view: potongan tabel panjang Route Test (row, Operator, Nilai, Latitude, Longitude, Alamat, dan
+    # bila ada Tanggal_str / Keterangan). Kembalikan payload per operator untuk TrackLayer (None jika
+    # tidak ada sampel valid)
+    if view is None or view.empty:
+        return None
+    lat = view['Latitude'].to_numpy(dtype='float64')
+    lon = view['Longitude'].to_numpy(dtype='float64')
+    nilai = view['Nilai'].to_numpy(dtype='float64')
+    valid = np.isfinite(lat) & np.isfinite(lon) & beforeafter.measured(nilai)
+    if not valid.any():
+        return None
+
+    view = view[valid]
+    lat, lon, nilai = lat[valid], lon[valid], nilai[valid]
+    drive_columns = [col for col in DRIVE_COLUMNS if col in view.columns]
+    drive_codes = view.groupby(drive_columns, observed=True, sort=False, dropna=False).ngroup().to_numpy()
+    drive_labels = _drive_labels(view, drive_columns, drive_codes)
+    op_codes = view['Operator'].cat.codes.to_numpy()
+    operators = [str(op) for op in view['Operator'].cat.categories]
+
+    # Urutan lintasan: (drive, Operator), lalu urutan baris di file (urutan sampel GPS)
+    order = np.lexsort((view['row'].to_numpy(), op_codes, drive_codes))
+    lat, lon, nilai = lat[order], lon[order], nilai[order]
+    drive_codes, op_codes = drive_codes[order], op_codes[order]
+
+    track_key = drive_codes.astype('int64') * len(operators) + op_codes
+    starts = np.flatnonzero(np.r_[True, track_key[1:] != track_key[:-1]])
+    ends = np.r_[starts[1:], len(track_key)] - 1
+
+    x, y = spatialgrid.project(lat, lon)
+    importance = dp_importance(x, y, starts, ends, floor=min_importance(max_zoom))
+
+    # Jumlah kumulatif Nilai dan nomor urut per lintasan: rata-rata sampel yang dicakup segmen
+    # (a, b] = (cs[b] - cs[a]) / (k[b] - k[a]), termasuk sampel yang dibuang penyederhanaan
+    track_id = np.repeat(np.arange(len(starts)), ends - starts + 1)
+    cumulative = np.cumsum(nilai)
+    base = np.r_[0.0, cumulative][starts]
+    cs = cumulative - base[track_id]
+    k = np.arange(len(nilai)) - starts[track_id] + 1
+
+    kept = importance > 0
+    breaks, palette = color_scale(nilai, parameter)
+    payloads = {}
+    for op_idx, operator in enumerate(operators):
+        tracks = np.flatnonzero(op_codes[starts] == op_idx)
+        if len(tracks) == 0:
+            continue
+        points = np.flatnonzero(kept & (op_codes == op_idx))
+        # Offset awal setiap lintasan di dalam array titik yang dipertahankan
+        track_offsets = np.searchsorted(points, starts[tracks])
+        payloads[operator] = {
+            'operator': operator,
+            'param': str(parameter),
+            'lat': lat[points].tolist(),
+            'lon': lon[points].tolist(),
+            'imp': importance[points].tolist(),
+            'cs': np.round(cs[points], 4).tolist(),
+            'k': k[points].tolist(),
+            'track_start': np.r_[track_offsets, len(points)].tolist(),
+            'track_label': [drive_labels[c] for c in drive_codes[starts[tracks]]],
+            'breaks': breaks,
+            'palette': palette,
+            'tolerance_px': TOLERANCE_PX,
+        }
+    return payloads
@@ -0,0 +1,128 @@
+# Penampil data mentah di sisi server: pencarian teks, pengurutan, proyeksi kolom dan
+# paginasi dijalankan pada frame bertipe, sehingga hanya jendela halaman yang tampil
+# yang dikirim ke browser. Jumlah baris dan statistik kolom dibaca dari metadata Parquet.
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from qoe import ingest, streaming
+
+PAGE_SIZES = [25, 50, 100, 500, 1000]
+
+
+def store_files(file_hash):
+    # File Parquet yang menyimpan data bertipe untuk hash ini (snapshot tunggal atau partisi streaming)
+    if streaming.is_ingested(file_hash):
+        return sorted(glob.glob(os.path.join(streaming.dataset_dir(file_hash), streaming.PARTS_DIR, "*.parquet")))
+    path = ingest.snapshot_path(file_hash)
+    return [path] if os.path.exists(path) else []
+
+
+def _merge(current, value, pick):
+    if value is None:
+        return current
+    if current is None:
+        return value
+    try:
+        return pick(current, value)
+    except TypeError:
+        return current
+
+
+def _as_text(table):
+    # Min/Max berisi tipe campuran antar kolom - tampilkan sebagai teks
+    for col in ['Min', 'Max']:
+        table[col] = [('' if value is None or value is pd.NaT else str(value)) for value in table[col]]
+    return table
+
+
+def metadata_stats(paths):
+    # Gabungkan statistik row group (jumlah baris, null, min, max) dari footer Parquet
+    n_rows = 0
+    stats = {}
+    for path in paths:
+        meta = pq.ParquetFile(path).metadata
+        n_rows += meta.num_rows
+        for rg in range(meta.num_row_groups):
+            row_group = meta.row_group(rg)
+            for i in range(row_group.num_columns):
+                column = row_group.column(i)
+                entry = stats.setdefault(column.path_in_schema, {'Null': 0, 'Min': None, 'Max': None})
+                col_stats = column.statistics
+                if col_stats is None:
+                    continue
+                entry['Null'] += col_stats.null_count or 0
+                if col_stats.has_min_max:
+                    entry['Min'] = _merge(entry['Min'], col_stats.min, min)
+                    entry['Max'] = _merge(entry['Max'], col_stats.max, max)
+
+    table = pd.DataFrame([{'Kolom': name, **entry} for name, entry in stats.items()])
+    return n_rows, _as_text(table)
+
+
+def frame_stats(df):
+    # Cadangan bila tidak ada file Parquet: statistik dihitung dari kolom bertipe
+    rows = []
+    for col in df.columns:
+        series = df[col]
+        entry = {'Kolom': col, 'Null': int(series.isna().sum()), 'Min': None, 'Max': None}
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            categories = series.cat.categories
+            if len(categories):
+                entry['Min'], entry['Max'] = categories.min(), categories.max()
+        elif pd.api.types.is_numeric_dtype(series) or pd.api.types.is_datetime64_any_dtype(series):
+            entry['Min'], entry['Max'] = series.min(), series.max()
+        rows.append(entry)
+    return len(df), _as_text(pd.DataFrame(rows))
+
+
+def search_rows(df, text):
+    # Posisi baris yang salah satu kolom teksnya memuat text (tanpa membedakan huruf besar/kecil).
+    # Untuk kolom categorical pencocokan dilakukan pada kategori, bukan per baris.
+    mask = np.zeros(len(df), dtype=bool)
+    for col in df.columns:
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            categories = series.cat.categories.astype(str)
+            matched = np.flatnonzero(categories.str.contains(text, case=False, regex=False))
+            if len(matched):
+                mask |= np.isin(series.cat.codes.to_numpy(), matched)
+        elif pd.api.types.is_string_dtype(series) or series.dtype == object:
+            mask |= series.astype(str).str.contains(text, case=False, regex=False).to_numpy()
+    return np.flatnonzero(mask)
+
+
+def sort_rows(df, rows, column, ascending=True):
+    # Urutkan posisi rows berdasarkan kolom (categorical diurutkan menurut teks kategorinya)
+    series = df[column]
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Peringkat kategori secara leksikografis, lalu urutkan peringkat per baris sebagai angka
+        rank = np.argsort(np.argsort(series.cat.categories.astype(str).to_numpy(), kind='stable'), kind='stable')
+        codes = series.cat.codes.to_numpy()
+        keys = np.where(codes >= 0, rank[codes], np.nan)
+    else:
+        keys = series.to_numpy()
+
+    keys = pd.Series(keys[rows])
+    order = keys.sort_values(ascending=ascending, kind='stable', na_position='last').index.to_numpy()
+    return rows[order]
+
+
+def matching_rows(df, search=None, sort_by=None, ascending=True):
+    # Posisi baris hasil pencarian dan pengurutan (belum dipotong per halaman)
+    rows = search_rows(df, search) if search else np.arange(len(df))
+    if sort_by:
+        rows = sort_rows(df, rows, sort_by, ascending)
+    return rows
+
+
+def page(df, rows, columns=None, page_number=1, page_size=PAGE_SIZES[0]):
+    # Ambil hanya jendela halaman yang diminta dengan kolom yang dipilih
+    start = (max(page_number, 1) - 1) * page_size
+    view = df.iloc[rows[start:start + page_size]]
+    if columns:
+        view = view[list(columns)]
+    return view